@@ -1,26 +1,65 @@
 """PowerBI Authentication."""
 
-import requests
+import hashlib
+import threading
+import time
+from typing import Tuple
 
 from singer import utils
 from singer_sdk.authenticators import OAuthAuthenticator, SingletonMeta
 
+from tap_powerbi.session import SESSION
 
-def get_access_token(config: dict, resource: str = "https://analysis.windows.net/powerbi/api") -> str:
-    """Get an access token using the refresh token grant. Standalone (no stream needed)."""
-    response = requests.post(
-        "https://login.microsoftonline.com/common/oauth2/token",
-        data={
-            "client_id": config["client_id"],
-            "client_secret": config["client_secret"],
-            "redirect_uri": config["redirect_uri"],
-            "refresh_token": config["refresh_token"],
-            "grant_type": "refresh_token",
-            "resource": resource,
-        },
-    )
-    response.raise_for_status()
-    return response.json()["access_token"]
+# Refresh tokens this many seconds before AAD says they expire.
+TOKEN_EXPIRY_BUFFER = 5 * 60
+DEFAULT_TOKEN_LIFETIME = 60 * 60
+
+# sha256(client_id, refresh_token, resource) -> (access_token, expires_at)
+_TOKEN_CACHE: dict = {}
+_TOKEN_LOCK = threading.Lock()
+
+
+def _token_cache_key(config: dict, resource: str) -> str:
+    raw = "\0".join((config["client_id"], config["refresh_token"], resource))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+POWERBI_RESOURCE = "https://analysis.windows.net/powerbi/api"
+
+
+def get_access_token(config: dict, resource: str = POWERBI_RESOURCE) -> str:
+    """Get an access token using the refresh token grant. Standalone (no stream needed).
+
+    Tokens are cached per credentials and resource until shortly before they
+    expire, so repeated calls within a run cost no extra round-trips to AAD.
+    """
+    return _get_cached_token(config, resource)[0]
+
+
+def _get_cached_token(config: dict, resource: str) -> Tuple[str, float]:
+    """Return ``(access_token, expires_at)``, refreshing it if near expiry."""
+    key = _token_cache_key(config, resource)
+    with _TOKEN_LOCK:
+        cached_token = _TOKEN_CACHE.get(key)
+        if cached_token and time.time() < cached_token[1] - TOKEN_EXPIRY_BUFFER:
+            return cached_token
+
+        response = SESSION.post(
+            "https://login.microsoftonline.com/common/oauth2/token",
+            data={
+                "client_id": config["client_id"],
+                "client_secret": config["client_secret"],
+                "redirect_uri": config["redirect_uri"],
+                "refresh_token": config["refresh_token"],
+                "grant_type": "refresh_token",
+                "resource": resource,
+            },
+        )
+        response.raise_for_status()
+        token_json = response.json()
+        expires_in = int(token_json.get("expires_in", DEFAULT_TOKEN_LIFETIME))
+        _TOKEN_CACHE[key] = (token_json["access_token"], time.time() + expires_in)
+        return _TOKEN_CACHE[key]
 
 
 class PowerBIAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
@@ -44,6 +83,19 @@ class PowerBIAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
             auth_endpoint=f"https://login.microsoftonline.com/common/oauth2/token",
         )
 
+    def update_access_token(self) -> None:
+        """Fetch a token through the cache shared with discovery.
+
+        Streams and discovery then share one token per run instead of each
+        stream doing its own refresh-token exchange.
+        """
+        request_time = utils.now()
+        access_token, expires_at = _get_cached_token(self.config, POWERBI_RESOURCE)
+        self.access_token = access_token
+        # Expire the stream's copy when the shared cache would refresh it.
+        self.expires_in = max(1, int(expires_at - time.time() - TOKEN_EXPIRY_BUFFER))
+        self.last_refreshed = request_time
+
     def is_token_valid(self) -> bool:
         """Check if token is valid.
 
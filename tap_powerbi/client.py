@@ -1,13 +1,18 @@
 """REST client handling, including PowerBIStream base class."""
 
-from typing import Any, Dict, Optional
+from itertools import chain
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Union
 
 import requests
 from memoization import cached
-from singer_sdk.streams import RESTStream
+from singer_sdk.helpers.jsonpath import extract_jsonpath
+from singer_sdk.plugin_base import PluginBase as TapBaseClass
+from singer_sdk.streams import RESTStream, Stream
 from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
 
 from tap_powerbi.auth import PowerBIAuthenticator
+from tap_powerbi.jsonutil import load_json
+from tap_powerbi.session import STREAM_SESSION
 
 
 class PowerBIStream(RESTStream):
@@ -16,6 +21,38 @@ class PowerBIStream(RESTStream):
     url_base = "https://api.powerbi.com/v1.0/myorg"
     records_jsonpath = "$.value[*]"
 
+    # Status lookups for validate_response, rebuilt for each subclass so that
+    # overriding extra_retry_statuses still takes effect.
+    _retry_statuses: FrozenSet[int] = frozenset(
+        chain(range(500, 600), RESTStream.extra_retry_statuses)
+    )
+    _fatal_statuses: FrozenSet[int] = frozenset(range(400, 500))
+
+    def __init__(
+        self,
+        tap: TapBaseClass,
+        name: Optional[str] = None,
+        schema: Optional[Union[Dict[str, Any], Any]] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        # Mirrors RESTStream.__init__ (test_session checks the attributes stay
+        # in sync), minus the requests.Session it builds for every stream: all
+        # streams share STREAM_SESSION, and with thousands of discovered
+        # streams those unused sessions dominated construction time.
+        Stream.__init__(self, name=name, schema=schema, tap=tap)
+        if path:
+            self.path = path
+        self._http_headers: dict = {}
+        self._requests_session = STREAM_SESSION
+        self._compiled_jsonpath = None
+        self._next_page_token_compiled_jsonpath = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._retry_statuses = frozenset(
+            chain(range(500, 600), cls.extra_retry_statuses)
+        )
+
     @property
     @cached
     def authenticator(self) -> PowerBIAuthenticator:
@@ -42,13 +79,17 @@ class PowerBIStream(RESTStream):
         """Return a dictionary of values to be used in URL parameterization."""
         return {}
 
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Parse the response body with orjson and yield each record."""
+        yield from extract_jsonpath(
+            self.records_jsonpath, input=load_json(response.content)
+        )
+
     def validate_response(self, response: requests.Response) -> None:
-        if (
-            response.status_code in self.extra_retry_statuses
-            or 500 <= response.status_code < 600
-        ):
+        status = response.status_code
+        if status in self._retry_statuses:
             msg = self.response_error_message(response)
             raise RetriableAPIError(msg, response)
-        elif 400 <= response.status_code < 500:
+        elif status in self._fatal_statuses:
             msg = self.response_error_message(response)
             raise FatalAPIError(msg)
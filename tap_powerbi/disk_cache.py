@@ -0,0 +1,66 @@
+"""On-disk JSON cache for discovery metadata that rarely changes between runs.
+
+Fabric getDefinition calls are slow (a POST plus a long-running operation to
+poll), yet semantic model and report definitions change far less often than
+the tap runs.  Values are stored one JSON file per key and expire by age.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "tap-powerbi"
+
+
+class DiskCache:
+    """A directory of JSON files keyed by string, each valid for ``ttl`` seconds.
+
+    A ``ttl`` of zero or less disables the cache: reads miss and writes are
+    dropped.  I/O errors are never fatal; they only cost a cache miss.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        root: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.directory = Path(root or DEFAULT_CACHE_DIR).expanduser() / namespace
+        self.ttl = ttl
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key``, or None if missing or expired."""
+        if self.ttl <= 0:
+            return None
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            return orjson.loads(path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store ``value`` under ``key``, replacing any previous entry atomically."""
+        if self.ttl <= 0:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(orjson.dumps(value))
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.debug(f"Could not write cache entry to {self.directory}: {e}")
@@ -0,0 +1,16 @@
+"""JSON decoding shared by the HTTP client and the definition parsers."""
+
+import codecs
+from typing import Any
+
+import orjson
+
+
+def load_json(content: bytes) -> Any:
+    """Decode a JSON document with orjson.
+
+    executeQueries responses start with a UTF-8 BOM, which orjson rejects.
+    """
+    if content.startswith(codecs.BOM_UTF8):
+        content = content[len(codecs.BOM_UTF8):]
+    return orjson.loads(content)
@@ -9,23 +9,47 @@ This module normalises them all to simple column names.
 """
 
 import re
+from functools import lru_cache
 
-# Matches [Table].[Column]
-_BRACKET_DOT_PATTERN = re.compile(r"^\[.*?\]\.\[(.+)\]$")
-# Matches TableName[ColumnName]
-_TABLE_BRACKET_PATTERN = re.compile(r"^.+?\[(.+)\]$")
-# Matches [ColumnName]
-_BARE_BRACKET_PATTERN = re.compile(r"^\[(.+)\]$")
+# One alternation, tried in order:
+#   [Table].[Column]  ->  group "dotted"
+#   TableName[Column] ->  group "table"
+#   [Column]          ->  group "bare"
+_KEY_PATTERN = re.compile(
+    r"^(?:\[.*?\]\.\[(?P<dotted>.+)\]"
+    r"|.+?\[(?P<table>.+)\]"
+    r"|\[(?P<bare>.+)\])$"
+)
+_match_key = _KEY_PATTERN.match
+
+
+@lru_cache(maxsize=4096)
+def _strip_key(key: str) -> str:
+    """Return the bare column name for a single Power BI row key.
+
+    Memoized too, since the same columns recur across the row shapes of
+    every query against a table.
+    """
+    if not key.endswith("]"):
+        return key
+    start = key.find("[")
+    if start > 0 or (start == 0 and key.find("[", 1) < 0):
+        # TableName[Column] or [Column]: plain slicing, no regex needed.
+        return key[start + 1:-1] or key
+    match = _match_key(key)
+    return match.group(match.lastindex or 0) if match else key
+
+
+@lru_cache(maxsize=1024)
+def _strip_keys(keys: tuple) -> tuple:
+    """Return the stripped names for one row shape (its ordered key tuple)."""
+    return tuple(map(_strip_key, keys))
 
 
 def flatten_row(row: dict) -> dict:
-    """Strip table/column prefixes from a Power BI row dict."""
-    cleaned = {}
-    for key, value in row.items():
-        match = (
-            _BRACKET_DOT_PATTERN.match(key)
-            or _TABLE_BRACKET_PATTERN.match(key)
-            or _BARE_BRACKET_PATTERN.match(key)
-        )
-        cleaned[match.group(1) if match else key] = value
-    return cleaned
+    """Strip table/column prefixes from a Power BI row dict.
+
+    Every row of a query result has the same keys, so the stripped names are
+    computed once per row shape and zipped onto each row's values.
+    """
+    return dict(zip(_strip_keys(tuple(row)), row.values()))
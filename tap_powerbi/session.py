@@ -0,0 +1,106 @@
+"""Shared HTTP session for discovery and auth calls.
+
+Module-level ``requests.get``/``requests.post`` open a new TCP+TLS connection
+per call.  Routing every call through one pooled session keeps connections to
+the Power BI, Fabric and AAD hosts alive across requests and threads.
+"""
+
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class JitteredRetry(Retry):
+    """Exponential backoff with up to one second of random jitter added.
+
+    Jitter keeps concurrent discovery threads from retrying in lockstep after
+    Power BI throttles them all at once.
+    """
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return backoff + random.random() if backoff else backoff
+
+
+class RateLimiter:
+    """Spaces request starts evenly at no more than ``rate`` per second.
+
+    Shared by every thread using a session, so parallel discovery stays under
+    Power BI's request limits instead of bursting into 429s.  A ``rate`` of
+    zero (the default) disables limiting.
+    """
+
+    def __init__(self, rate: float = 0) -> None:
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> None:
+        """Block until the caller may start its request."""
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that waits on a RateLimiter before sending each request."""
+
+    def __init__(self, rate_limiter=None, **kwargs) -> None:
+        self.rate_limiter = rate_limiter or RateLimiter()
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.rate_limiter.acquire()
+        return super().send(request, **kwargs)
+
+
+def build_session(max_retries=None, rate_limiter=None) -> requests.Session:
+    """Return a session with a pooled, retrying HTTPS adapter mounted.
+
+    By default transient statuses are retried with jittered backoff; pass
+    ``max_retries`` to override that policy.  Requests are paced by
+    ``rate_limiter`` when given.
+    """
+    if max_retries is None:
+        max_retries = JitteredRetry(
+            total=6,
+            backoff_factor=0.5,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "POST"]),
+            respect_retry_after_header=True,
+        )
+    session = requests.Session()
+    adapter = RateLimitedAdapter(
+        rate_limiter=rate_limiter,
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=max_retries,
+    )
+    session.mount("https://", adapter)
+    # urllib3's list adds "br" when brotli is installed (the ``brotli`` extra),
+    # so compressed bodies are only requested in encodings we can decode.
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    return session
+
+
+# Discovery pacing; the tap sets its rate from the max_requests_per_second
+# setting before discovering.
+DISCOVERY_RATE_LIMITER = RateLimiter()
+
+SESSION = build_session(rate_limiter=DISCOVERY_RATE_LIMITER)
+
+# Session shared by every SDK stream.  The SDK already backs off on
+# retriable statuses, so this one only retries failed connections.
+STREAM_SESSION = build_session(max_retries=3)
@@ -1,14 +1,28 @@
 """Stream type classes for tap-powerbi."""
 
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
+import requests
 from singer_sdk import typing as th
 
 from tap_powerbi.client import PowerBIStream
+from tap_powerbi.jsonutil import load_json
 from tap_powerbi.type_mapping import build_schema_from_columns
 from tap_powerbi.row_flattener import flatten_row
 
 
+def _iter_query_rows(payload: dict) -> Iterable[dict]:
+    """Yield the flattened rows of an executeQueries response one at a time.
+
+    Equivalent to the ``$.results[*].tables[*].rows[*]`` JSONPath followed by
+    ``flatten_row``, in a single pass without building a match object per row
+    or an intermediate list of rows.
+    """
+    for result in payload.get("results", []):
+        for table in result.get("tables", []):
+            yield from map(flatten_row, table.get("rows", []))
+
+
 class WorkspacesStream(PowerBIStream):
     """Lists all Power BI workspaces the authenticated user can access."""
 
@@ -51,14 +65,19 @@ class DatasetsStream(PowerBIStream):
         th.Property("description", th.StringType),
     ).to_dict()
 
-    def post_process(self, row: dict, context: Optional[dict]) -> dict:
-        row["workspace_id"] = context.get("workspace_id")
-        row["workspace_name"] = context.get("workspace_name")
-        return row
+    def get_records(self, context: Optional[dict]) -> Iterable[dict]:
+        # Context is fixed for the whole partition; read it once, not per row.
+        workspace_id = context.get("workspace_id")
+        workspace_name = context.get("workspace_name")
+        for row in self.request_records(context):
+            row["workspace_id"] = workspace_id
+            row["workspace_name"] = workspace_name
+            yield row
 
     def get_child_context(self, record: dict, context: Optional[dict]) -> dict:
+        source = context or record
         return {
-            "workspace_id": context.get("workspace_id") if context else record.get("workspace_id"),
+            "workspace_id": source.get("workspace_id"),
             "dataset_id": record["id"],
             "dataset_name": record["name"],
         }
@@ -81,20 +100,26 @@ class DatasetTablesStream(PowerBIStream):
         th.Property("columns", th.CustomType({"type": ["array", "null"]})),
     ).to_dict()
 
-    def post_process(self, row: dict, context: Optional[dict]) -> dict:
-        return {
-            "workspace_id": context.get("workspace_id"),
-            "dataset_id": context.get("dataset_id"),
-            "dataset_name": context.get("dataset_name"),
-            "table_name": row.get("name"),
-            "columns": row.get("columns", []),
-        }
+    def get_records(self, context: Optional[dict]) -> Iterable[dict]:
+        # Context is fixed for the whole partition; read it once, not per row.
+        workspace_id = context.get("workspace_id")
+        dataset_id = context.get("dataset_id")
+        dataset_name = context.get("dataset_name")
+        for row in self.request_records(context):
+            yield {
+                "workspace_id": workspace_id,
+                "dataset_id": dataset_id,
+                "dataset_name": dataset_name,
+                "table_name": row.get("name"),
+                "columns": row.get("columns", []),
+            }
 
     def get_child_context(self, record: dict, context: Optional[dict]) -> dict:
+        source = context or record
         return {
-            "workspace_id": context.get("workspace_id") if context else record.get("workspace_id"),
-            "dataset_id": context.get("dataset_id") if context else record.get("dataset_id"),
-            "dataset_name": context.get("dataset_name") if context else record.get("dataset_name"),
+            "workspace_id": source.get("workspace_id"),
+            "dataset_id": source.get("dataset_id"),
+            "dataset_name": source.get("dataset_name"),
             "table_name": record["table_name"],
             "table_columns": record.get("columns", []),
         }
@@ -107,7 +132,6 @@ class TableDataStream(PowerBIStream):
     """
 
     rest_method = "POST"
-    records_jsonpath = "$.results[*].tables[*].rows[*]"
 
     def __init__(self, tap, name: str, workspace_id: str, dataset_id: str,
                  dataset_name: str, table_name: str, columns: list, **kwargs):
@@ -133,8 +157,8 @@ class TableDataStream(PowerBIStream):
             "serializerSettings": {"includeNulls": True},
         }
 
-    def post_process(self, row: dict, context: Optional[dict]) -> dict:
-        return flatten_row(row)
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        return _iter_query_rows(load_json(response.content))
 
     def get_next_page_token(
         self, response, previous_token: Optional[Any]
@@ -149,7 +173,6 @@ class VisualDataStream(PowerBIStream):
     """
 
     rest_method = "POST"
-    records_jsonpath = "$.results[*].tables[*].rows[*]"
 
     def __init__(self, tap, name: str, workspace_id: str, dataset_id: str,
                  report_name: str, visual_title: str, visual_type: str,
@@ -178,8 +201,8 @@ class VisualDataStream(PowerBIStream):
             "serializerSettings": {"includeNulls": True},
         }
 
-    def post_process(self, row: dict, context: Optional[dict]) -> dict:
-        return flatten_row(row)
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        return _iter_query_rows(load_json(response.content))
 
     def get_next_page_token(
         self, response, previous_token: Optional[Any]
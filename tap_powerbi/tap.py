@@ -1,14 +1,24 @@
 """PowerBI tap class."""
 
+import hashlib
 import logging
+import random
 import time
-from typing import List
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from operator import itemgetter
+from pathlib import Path, PurePath
+from typing import Dict, List, Optional, Set, Tuple, Union
 
-import requests
+import orjson
+from memoization import cached
 from singer_sdk import Stream, Tap
+from singer_sdk.helpers._singer import Catalog
 from singer_sdk import typing as th
 
 from tap_powerbi.auth import get_access_token
+from tap_powerbi.disk_cache import DiskCache
+from tap_powerbi.jsonutil import load_json
+from tap_powerbi.session import DISCOVERY_RATE_LIMITER, SESSION
 from tap_powerbi.streams import (
     WorkspacesStream,
     DatasetsStream,
@@ -24,75 +34,278 @@ logger = logging.getLogger(__name__)
 API_BASE = "https://api.powerbi.com/v1.0/myorg"
 FABRIC_API_BASE = "https://api.fabric.microsoft.com/v1"
 
+# Power BI throttles aggressively (429) when too many requests are in flight.
+DEFAULT_DISCOVERY_CONCURRENCY = 8
+
+# Fabric getDefinition calls (and their operation polls) run on a separate pool.
+DEFAULT_FABRIC_CONCURRENCY = 8
+
+# Workspace/dataset/table metadata is effectively static for hours, so
+# discovery lookups are memoized per (arguments, bearer token).
+DISCOVERY_CACHE_TTL = 30 * 60
+
+# Discovery results are also persisted in Singer state under this key (and in
+# the on-disk catalog cache) so that later runs can skip discovery entirely
+# while the cache is fresh.
+DISCOVERY_STATE_KEY = "_discovery_cache"
+DEFAULT_DISCOVERY_TTL = 60 * 60
+
+# Fabric semantic model and report definitions are cached on disk across runs.
+# This outlives DEFAULT_DISCOVERY_TTL on purpose: rediscovery still picks up
+# new workspaces, datasets and reports every hour, while the definitions of
+# known ones, which rarely change, are reused.  force_discovery skips it.
+DEFAULT_DEFINITION_CACHE_TTL = 24 * 60 * 60
+
+# Statuses with which GET /tables rejects non-push datasets.  Anything else
+# (auth failures, outages) would fail the Fabric fallback just the same.
+TABLES_NOT_AVAILABLE_STATUSES = frozenset((400, 403, 404))
+
+# Page size for admin API listings ($top is capped at 5000).
+ADMIN_PAGE_SIZE = 5000
+
+# Shortest wait between polls of a Fabric long-running operation, in seconds.
+MIN_POLL_INTERVAL = 0.25
+
+# Upper bound on the time spent polling one Fabric operation, in seconds, and
+# the minimum time its reported progress must stand still to count as stuck
+# (at least three Retry-After intervals are always allowed).
+DEFAULT_FABRIC_POLL_DEADLINE = 60
+MIN_STALL_SECONDS = 30
+
+
+def _table_specs(ws_id, ds_id, ds_name, tables):
+    """Build the stream specs for the tables discovered in one dataset."""
+    return [
+        {
+            "workspace_id": ws_id,
+            "dataset_id": ds_id,
+            "dataset_name": ds_name,
+            "table_name": table["name"],
+            "columns": table.get("columns", []),
+        }
+        for table in tables
+    ]
+
+
+# Stream spec sort keys: workspace, then dataset/report, then table/visual.
+_TABLE_SPEC_ORDER = itemgetter(
+    "workspace_id", "dataset_name", "dataset_id", "table_name"
+)
+_VISUAL_SPEC_ORDER = itemgetter(
+    "workspace_id", "report_name", "dataset_id", "visual_title"
+)
+
+
+class TablesNotAvailableError(Exception):
+    """REST /tables is not supported for a dataset (it is not a push dataset)."""
+
+
+def _powerbi_headers(token):
+    """Build the headers shared by every Power BI REST discovery call."""
+    return {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+
+
+def _fabric_headers(token):
+    """Build the headers shared by every Fabric call.
+
+    getDefinition POSTs need the JSON Content-Type and operation polls ignore
+    it, so one dict built per run serves both without per-call merging.
+    """
+    return {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+    }
+
 
+@cached(ttl=DISCOVERY_CACHE_TTL)
+def _list_workspaces(headers):
+    """List the workspaces visible to the authenticated user."""
+    resp = SESSION.get(f"{API_BASE}/groups", headers=headers)
+    resp.raise_for_status()
+    return load_json(resp.content).get("value", [])
+
+
+@cached(ttl=DISCOVERY_CACHE_TTL)
+def _list_workspaces_expanded(headers):
+    """List every active workspace in the tenant with datasets and reports inlined.
+
+    Uses the admin API's ``$expand``, so one paged call replaces the dataset
+    and report listings otherwise made per workspace.
+    """
+    workspaces = []
+    while True:
+        resp = SESSION.get(
+            f"{API_BASE}/admin/groups",
+            headers=headers,
+            params={
+                "$top": ADMIN_PAGE_SIZE,
+                "$skip": len(workspaces),
+                "$expand": "datasets,reports",
+            },
+        )
+        resp.raise_for_status()
+        page = load_json(resp.content).get("value", [])
+        workspaces.extend(page)
+        if len(page) < ADMIN_PAGE_SIZE:
+            break
+    return [
+        ws for ws in workspaces
+        if ws.get("state", "Active") == "Active" and ws.get("type") != "PersonalGroup"
+    ]
+
+
+@cached(ttl=DISCOVERY_CACHE_TTL)
+def _list_datasets(ws_id, headers):
+    """List the datasets in a workspace."""
+    resp = SESSION.get(f"{API_BASE}/groups/{ws_id}/datasets", headers=headers)
+    resp.raise_for_status()
+    return load_json(resp.content).get("value", [])
+
+
+@cached(ttl=DISCOVERY_CACHE_TTL)
+def _list_reports(ws_id, headers):
+    """List the reports in a workspace."""
+    resp = SESSION.get(f"{API_BASE}/groups/{ws_id}/reports", headers=headers)
+    resp.raise_for_status()
+    return load_json(resp.content).get("value", [])
+
+
+@cached(ttl=DISCOVERY_CACHE_TTL)
 def _discover_tables_via_rest(ws_id, ds_id, headers):
-    """Try GET /tables endpoint (works for push datasets)."""
-    resp = requests.get(
+    """Try GET /tables endpoint (works for push datasets).
+
+    Raises TablesNotAvailableError when the endpoint rejects the dataset
+    itself, the case where the Fabric fallback can help.
+    """
+    resp = SESSION.get(
         f"{API_BASE}/groups/{ws_id}/datasets/{ds_id}/tables",
         headers=headers,
     )
+    if resp.status_code in TABLES_NOT_AVAILABLE_STATUSES:
+        raise TablesNotAvailableError(
+            f"GET /tables returned {resp.status_code} for dataset {ds_id}"
+        )
     resp.raise_for_status()
-    return resp.json().get("value", [])
+    return load_json(resp.content).get("value", [])
 
 
-def _discover_tables_via_fabric(ws_id, ds_id, headers):
+def _fabric_tables_key(ws_id, ds_id, headers, definition_cache=None,
+                       poll_deadline=DEFAULT_FABRIC_POLL_DEADLINE):
+    """Memo key for ``_discover_tables_via_fabric``.
+
+    Leaves out the disk cache, a new object every run, which would otherwise
+    make every call a memo miss.
+    """
+    return ws_id, ds_id, tuple(sorted(headers.items()))
+
+
+@cached(ttl=DISCOVERY_CACHE_TTL, custom_key_maker=_fabric_tables_key)
+def _discover_tables_via_fabric(ws_id, ds_id, headers, definition_cache=None,
+                                poll_deadline=DEFAULT_FABRIC_POLL_DEADLINE):
     """Use Fabric getDefinition API to discover tables from TMDL."""
-    resp = requests.post(
+    definition = _get_fabric_definition(
         f"{FABRIC_API_BASE}/workspaces/{ws_id}/semanticModels/{ds_id}/getDefinition",
-        headers={**headers, "Content-Type": "application/json"},
+        headers,
+        definition_cache=definition_cache,
+        poll_deadline=poll_deadline,
     )
+    return tables_from_definition(definition)
 
-    if resp.status_code == 200:
-        definition = resp.json().get("definition", {})
-    elif resp.status_code == 202:
-        definition = _poll_fabric_operation(resp, headers)
-    else:
-        resp.raise_for_status()
-        return []  # unreachable
 
-    return tables_from_definition(definition)
+def _report_visuals_key(ws_id, report_id, headers, definition_cache=None,
+                        poll_deadline=DEFAULT_FABRIC_POLL_DEADLINE):
+    """Memo key for ``_discover_report_visuals``; see ``_fabric_tables_key``."""
+    return ws_id, report_id, tuple(sorted(headers.items()))
 
 
-def _discover_report_visuals(ws_id, report_id, headers):
+@cached(ttl=DISCOVERY_CACHE_TTL, custom_key_maker=_report_visuals_key)
+def _discover_report_visuals(ws_id, report_id, headers, definition_cache=None,
+                             poll_deadline=DEFAULT_FABRIC_POLL_DEADLINE):
     """Use Fabric getDefinition API to discover visuals from a report."""
-    resp = requests.post(
+    definition = _get_fabric_definition(
         f"{FABRIC_API_BASE}/workspaces/{ws_id}/reports/{report_id}/getDefinition",
-        headers={**headers, "Content-Type": "application/json"},
-        json={"format": "PBIR-Legacy"},
+        headers,
+        body={"format": "PBIR-Legacy"},
+        definition_cache=definition_cache,
+        poll_deadline=poll_deadline,
+    )
+    return visuals_from_report_definition(definition)
+
+
+def _get_fabric_definition(url, headers, body=None, definition_cache=None,
+                           poll_deadline=DEFAULT_FABRIC_POLL_DEADLINE):
+    """Return an item definition from Fabric getDefinition, via the disk cache.
+
+    ``headers`` must already carry the JSON Content-Type; see
+    ``_fabric_headers``.
+
+    The raw definition is cached rather than the parsed tables/visuals, so
+    parser changes apply to cached definitions too.
+    """
+    cache_key = f"{url}|{body}"
+    if definition_cache is not None:
+        definition = definition_cache.get(cache_key)
+        if definition is not None:
+            return definition
+
+    resp = SESSION.post(
+        url,
+        headers=headers,
+        json=body,
     )
 
     if resp.status_code == 200:
-        definition = resp.json().get("definition", {})
+        definition = load_json(resp.content).get("definition", {})
     elif resp.status_code == 202:
-        definition = _poll_fabric_operation(resp, headers)
+        definition = _poll_fabric_operation(resp, headers, deadline_seconds=poll_deadline)
     else:
         resp.raise_for_status()
-        return []
+        raise RuntimeError(f"Unexpected getDefinition status {resp.status_code}")
 
-    return visuals_from_report_definition(definition)
+    if definition_cache is not None:
+        definition_cache.set(cache_key, definition)
+    return definition
 
 
-def _poll_fabric_operation(initial_resp, headers, max_polls=30):
-    """Poll a Fabric long-running operation until completion."""
+def _poll_fabric_operation(initial_resp, headers, max_polls=30,
+                           deadline_seconds=DEFAULT_FABRIC_POLL_DEADLINE):
+    """Poll a Fabric long-running operation until completion.
+
+    getDefinition operations often finish well before the advertised
+    Retry-After, so polling starts at a tenth of it and backs off (with
+    jitter) up to Retry-After.  Polling gives up once ``deadline_seconds``
+    have passed, or when the reported progress stops moving.
+    """
     operation_url = initial_resp.headers.get("Location")
     operation_id = initial_resp.headers.get("x-ms-operation-id")
     retry_after = int(initial_resp.headers.get("Retry-After", 5))
+    delay = max(MIN_POLL_INTERVAL, retry_after / 10)
+    started = time.monotonic()
+    deadline = started + deadline_seconds
+    last_progress = None
+    last_change = started
 
     for _ in range(max_polls):
-        time.sleep(retry_after)
-        poll_resp = requests.get(operation_url, headers=headers)
+        if time.monotonic() + delay > deadline:
+            raise TimeoutError(
+                f"Fabric getDefinition did not finish within {deadline_seconds}s"
+            )
+        time.sleep(delay)
+        poll_resp = SESSION.get(operation_url, headers=headers)
         poll_resp.raise_for_status()
 
-        poll_data = poll_resp.json()
+        poll_data = load_json(poll_resp.content)
         status = poll_data.get("status")
 
         if status == "Succeeded":
-            result_resp = requests.get(
-                f"{FABRIC_API_BASE}/operations/{operation_id}/result",
-                headers=headers,
+            # A finished operation points at its result via Location.
+            result_url = poll_resp.headers.get("Location") or (
+                f"{FABRIC_API_BASE}/operations/{operation_id}/result"
             )
+            result_resp = SESSION.get(result_url, headers=headers)
             result_resp.raise_for_status()
-            return result_resp.json().get("definition", {})
+            return load_json(result_resp.content).get("definition", {})
 
         if status == "Failed":
             error = poll_data.get("error", {})
@@ -102,6 +315,19 @@ def _poll_fabric_operation(initial_resp, headers, max_polls=30):
 
         retry_after = int(poll_resp.headers.get("Retry-After", retry_after))
 
+        # Only a reported, non-zero percentComplete that stops moving counts as
+        # a stall; many operations report nothing until they finish.  Stalls
+        # are timed rather than counted, since early polls come quickly.
+        progress = poll_data.get("percentComplete")
+        if progress != last_progress:
+            last_progress, last_change = progress, time.monotonic()
+        elif progress and (
+            time.monotonic() - last_change >= max(3 * retry_after, MIN_STALL_SECONDS)
+        ):
+            raise TimeoutError(f"Fabric getDefinition stalled at {progress}% complete")
+
+        delay = min(retry_after, delay * 1.5 + random.uniform(0, MIN_POLL_INTERVAL))
+
     raise TimeoutError("Fabric getDefinition polling timed out")
 
 
@@ -115,8 +341,104 @@ class TapPowerBI(Tap):
         th.Property("client_secret", th.StringType, required=True),
         th.Property("redirect_uri", th.StringType, required=True),
         th.Property("refresh_token", th.StringType, required=True),
+        th.Property(
+            "discovery_concurrency",
+            th.IntegerType,
+            default=DEFAULT_DISCOVERY_CONCURRENCY,
+            description="Maximum number of datasets to discover tables for in parallel.",
+        ),
+        th.Property(
+            "max_requests_per_second",
+            th.NumberType,
+            default=0,
+            description=(
+                "Pace discovery requests to at most this many per second across "
+                "all threads (0 disables). 429s are retried with backoff either way."
+            ),
+        ),
+        th.Property(
+            "fabric_concurrency",
+            th.IntegerType,
+            default=DEFAULT_FABRIC_CONCURRENCY,
+            description="Maximum number of Fabric getDefinition calls to run in parallel.",
+        ),
+        th.Property(
+            "fabric_poll_deadline_seconds",
+            th.IntegerType,
+            default=DEFAULT_FABRIC_POLL_DEADLINE,
+            description="Maximum time to wait for one Fabric getDefinition operation.",
+        ),
+        th.Property(
+            "discovery_ttl_seconds",
+            th.IntegerType,
+            default=DEFAULT_DISCOVERY_TTL,
+            description="How long discovery results cached in state or on disk stay valid.",
+        ),
+        th.Property(
+            "force_discovery",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Ignore discovery results and Fabric definitions cached in state "
+                "or on disk."
+            ),
+        ),
+        th.Property(
+            "use_admin_api",
+            th.BooleanType,
+            default=False,
+            description=(
+                "List workspaces with datasets and reports expanded via the admin "
+                "API (requires Tenant.Read.All). Falls back to per-workspace calls."
+            ),
+        ),
+        th.Property(
+            "cache_dir",
+            th.StringType,
+            description="Directory for on-disk discovery caches (default ~/.cache/tap-powerbi).",
+        ),
+        th.Property(
+            "definition_cache_ttl_seconds",
+            th.IntegerType,
+            default=DEFAULT_DEFINITION_CACHE_TTL,
+            description=(
+                "How long Fabric model/report definitions stay cached on disk. "
+                "May exceed discovery_ttl_seconds, so rediscovery can reuse them; "
+                "lower it to pick up model changes sooner. Set to 0 to disable."
+            ),
+        ),
     ).to_dict()
 
+    def __init__(
+        self,
+        config: Optional[Union[dict, PurePath, str, List[Union[PurePath, str]]]] = None,
+        catalog: Union[PurePath, str, dict, Catalog, None] = None,
+        state: Union[PurePath, str, dict, None] = None,
+        parse_env_config: bool = False,
+        validate_config: bool = True,
+    ) -> None:
+        # The SDK runs discovery while constructing the tap, before it loads
+        # state, so keep the raw input state around for the discovery cache.
+        if isinstance(state, dict):
+            self._input_state = state
+        elif state:
+            self._input_state = orjson.loads(Path(state).read_bytes())
+        else:
+            self._input_state = {}
+        # Workspaces where REST /tables has rejected a dataset; their other
+        # datasets are most likely not push datasets either.
+        self._fabric_workspaces: set = set()
+        # Cleared when a discovery lookup fails and its error is swallowed;
+        # such partial results must not be cached for later runs.
+        self._discovery_complete = True
+        super().__init__(
+            config=config,
+            catalog=catalog,
+            state=state,
+            parse_env_config=parse_env_config,
+            validate_config=validate_config,
+        )
+
     def discover_streams(self) -> List[Stream]:
         """Discover all workspaces, datasets, tables, and report visuals."""
         streams: List[Stream] = [
@@ -125,127 +447,402 @@ class TapPowerBI(Tap):
             DatasetTablesStream(tap=self),
         ]
 
+        discovered = self._cached_discovery()
+        if discovered is None:
+            selection = self._selected_sources()
+            discovered = self._discover_stream_specs(selection)
+            if discovered is None:
+                return streams
+            if not discovered["complete"]:
+                logger.warning("Some discovery lookups failed; not caching discovery")
+            if selection is not None or not discovered["complete"]:
+                # Partial results must not stand in for a full discovery later.
+                streams.extend(self._build_streams(discovered))
+                return streams
+            self._catalog_cache().set(self._catalog_cache_key(), discovered)
+
+        # Carry the cache forward in every STATE message this run emits.
+        self.state[DISCOVERY_STATE_KEY] = discovered
+        streams.extend(self._build_streams(discovered))
+        return streams
+
+    def _cached_discovery(self) -> Optional[dict]:
+        """Return cached discovery results, if still fresh.
+
+        Results carried in the input state win; otherwise the last discovery
+        written to the on-disk catalog cache by any earlier run is used.
+        """
+        if self.config.get("force_discovery"):
+            return None
+        cached_discovery = self._input_state.get(DISCOVERY_STATE_KEY)
+        if self._is_fresh(cached_discovery):
+            logger.info("Reusing discovery results cached in state")
+            return cached_discovery
+        catalog_cache = self._catalog_cache()
+        cached_discovery = catalog_cache.get(self._catalog_cache_key())
+        if self._is_fresh(cached_discovery):
+            logger.info(f"Reusing discovery results cached in {catalog_cache.directory}")
+            return cached_discovery
+        return None
+
+    def _is_fresh(self, cached_discovery: Optional[dict]) -> bool:
+        """Whether cached discovery results belong to this client and are in TTL."""
+        if not cached_discovery:
+            return False
+        if cached_discovery.get("client_id") != self.config.get("client_id"):
+            return False
+        ttl = self.config.get("discovery_ttl_seconds", DEFAULT_DISCOVERY_TTL)
+        return time.time() - cached_discovery.get("generated_at", 0) <= ttl
+
+    def _catalog_cache(self) -> DiskCache:
+        return DiskCache(
+            "catalog",
+            self.config.get("discovery_ttl_seconds", DEFAULT_DISCOVERY_TTL),
+            root=self.config.get("cache_dir"),
+        )
+
+    def _definition_cache(self) -> Optional[DiskCache]:
+        if self.config.get("force_discovery"):
+            return None
+        # Scoped like the catalog cache, so a principal never reads a model
+        # cached by another principal that can see more.
+        principal = hashlib.sha256(self._catalog_cache_key().encode("utf-8"))
+        return DiskCache(
+            f"definitions/{principal.hexdigest()}",
+            self.config.get("definition_cache_ttl_seconds", DEFAULT_DEFINITION_CACHE_TTL),
+            root=self.config.get("cache_dir"),
+        )
+
+    def _catalog_cache_key(self) -> str:
+        # Different refresh tokens can see different workspaces.
+        return f"{self.config.get('client_id')}\0{self.config.get('refresh_token')}"
+
+    def _selected_sources(self) -> Optional[Tuple[Set[str], Set[str]]]:
+        """Return the dataset and report names behind selected catalog streams.
+
+        Returns None when there is no input catalog, i.e. everything must be
+        discovered.
+        """
+        if not self.input_catalog:
+            return None
+        datasets: Set[str] = set()
+        reports: Set[str] = set()
+        for stream_id, entry in self.input_catalog.items():
+            if not entry.metadata.resolve_selection()[()]:
+                continue
+            name, table_sep, _ = stream_id.rpartition(" | table: ")
+            if table_sep:
+                datasets.add(name)
+                continue
+            name, visual_sep, _ = stream_id.rpartition(" | visual: ")
+            if visual_sep:
+                reports.add(name)
+        return datasets, reports
+
+    def _discover_stream_specs(
+        self, selection: Optional[Tuple[Set[str], Set[str]]] = None
+    ) -> Optional[dict]:
+        """Discover table and visual stream definitions from the Power BI APIs.
+
+        With a ``selection`` from ``_selected_sources``, tables and visuals
+        are only discovered for the selected datasets and reports.  Returns
+        None if the workspaces could not be listed.  ``complete`` in the result
+        is False when any other lookup failed and was skipped.
+        """
+        self._discovery_complete = True
+        DISCOVERY_RATE_LIMITER.rate = self.config.get("max_requests_per_second", 0)
+
         token = get_access_token(self.config)
-        headers = {"Authorization": f"Bearer {token}"}
+        headers = _powerbi_headers(token)
 
         fabric_token = get_access_token(self.config, resource="https://api.fabric.microsoft.com")
-        fabric_headers = {"Authorization": f"Bearer {fabric_token}"}
-
+        fabric_headers = _fabric_headers(fabric_token)
+
+        definition_cache = self._definition_cache()
+
+        workspaces = self._discover_workspaces(headers)
+        if workspaces is None:
+            return None
+
+        # Discovery is network-bound, so fan it out across a bounded pool:
+        # list every workspace's datasets and reports concurrently, and queue
+        # table/visual discovery for each item as soon as its listing lands.
+        max_workers = self.config.get(
+            "discovery_concurrency", DEFAULT_DISCOVERY_CONCURRENCY
+        )
+        # Fabric getDefinition calls spend most of their time sleeping between
+        # operation polls, so they get their own pool rather than starving the
+        # quick REST listings of workers.
+        fabric_workers = self.config.get("fabric_concurrency", DEFAULT_FABRIC_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                ThreadPoolExecutor(max_workers=fabric_workers) as fabric_executor:
+            dataset_futures: Dict[Future, str] = {}
+            report_futures: Dict[Future, str] = {}
+            for ws in workspaces:
+                if selection is None or selection[0]:
+                    future = executor.submit(self._discover_datasets, ws, headers)
+                    dataset_futures[future] = ws["id"]
+                if selection is None or selection[1]:
+                    future = executor.submit(self._discover_reports, ws, headers)
+                    report_futures[future] = ws["id"]
+
+            table_futures: Dict[Future, Tuple[str, str, str]] = {}
+            visual_futures: Dict[Future, Tuple[str, dict]] = {}
+            for future in as_completed([*dataset_futures, *report_futures]):
+                if future in dataset_futures:
+                    table_futures.update(self._submit_table_discovery(
+                        executor, dataset_futures[future], future.result(),
+                        selection, headers,
+                    ))
+                else:
+                    visual_futures.update(self._submit_visual_discovery(
+                        fabric_executor, report_futures[future], future.result(),
+                        selection, fabric_headers, definition_cache,
+                    ))
+
+            table_specs = self._collect_table_specs(
+                table_futures, fabric_executor, headers, fabric_headers,
+                definition_cache,
+            )
+            visual_specs = self._collect_visual_specs(visual_futures)
+
+        return {
+            "generated_at": time.time(),
+            "client_id": self.config.get("client_id"),
+            "tables": table_specs,
+            "visuals": visual_specs,
+            "complete": self._discovery_complete,
+        }
+
+    def _discover_workspaces(self, headers: dict) -> Optional[list]:
+        """List workspaces, expanded via the admin API when configured.
+
+        Returns None if the workspaces could not be listed.
+        """
+        if self.config.get("use_admin_api"):
+            try:
+                return _list_workspaces_expanded(headers)
+            except Exception as e:
+                logger.warning(
+                    f"Admin workspace listing failed, using per-workspace calls: {e}"
+                )
         try:
-            workspaces_resp = requests.get(f"{API_BASE}/groups", headers=headers)
-            workspaces_resp.raise_for_status()
-            workspaces = workspaces_resp.json().get("value", [])
+            return _list_workspaces(headers)
         except Exception as e:
             logger.warning(f"Failed to discover workspaces: {e}")
-            return streams
-
-        for ws in workspaces:
-            ws_id = ws["id"]
-            ws_name = ws.get("name", ws_id)
-
-            # --- Discover raw table streams from datasets ---
-            datasets = self._discover_datasets(ws_id, headers)
-            dataset_map = {}  # dataset_id -> dataset_name for report lookups
-
-            for ds in datasets:
-                ds_id = ds["id"]
-                ds_name = ds["name"]
-                dataset_map[ds_id] = ds_name
-
-                tables = self._discover_tables(ws_id, ds_id, ds_name, headers, fabric_headers)
-                for table in tables:
-                    table_name = table["name"]
-                    columns = table.get("columns", [])
-                    stream_name = f"{ds_name} | table: {table_name}"
-                    streams.append(
-                        TableDataStream(
-                            tap=self,
-                            name=stream_name,
-                            workspace_id=ws_id,
-                            dataset_id=ds_id,
-                            dataset_name=ds_name,
-                            table_name=table_name,
-                            columns=columns,
-                        )
-                    )
-
-            # --- Discover visual streams from reports ---
-            reports = self._discover_reports(ws_id, headers)
-            for report in reports:
-                report_id = report["id"]
-                report_name = report["name"]
-                dataset_id = report.get("datasetId")
-
-                if not dataset_id:
-                    logger.debug(f"Report '{report_name}' has no datasetId, skipping visuals")
-                    continue
-
-                try:
-                    visuals = _discover_report_visuals(ws_id, report_id, fabric_headers)
-                    logger.info(
-                        f"Discovered {len(visuals)} visuals in report '{report_name}'"
-                    )
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to discover visuals for report '{report_name}' ({report_id}): {e}"
-                    )
-                    continue
-
-                for visual in visuals:
-                    visual_title = visual["title"]
-                    stream_name = f"{report_name} | visual: {visual_title}"
-                    streams.append(
-                        VisualDataStream(
-                            tap=self,
-                            name=stream_name,
-                            workspace_id=ws_id,
-                            dataset_id=dataset_id,
-                            report_name=report_name,
-                            visual_title=visual_title,
-                            visual_type=visual["visual_type"],
-                            dax_query=visual["dax_query"],
-                            columns=visual["columns"],
-                        )
-                    )
-
+            return None
+
+    def _submit_table_discovery(
+        self,
+        executor: ThreadPoolExecutor,
+        ws_id: str,
+        datasets: list,
+        selection: Optional[Tuple[Set[str], Set[str]]],
+        headers: dict,
+    ) -> Dict[Future, Tuple[str, str, str]]:
+        """Queue REST table discovery for a workspace's (selected) datasets."""
+        table_futures: Dict[Future, Tuple[str, str, str]] = {}
+        for ds in datasets:
+            if selection is not None and ds["name"] not in selection[0]:
+                continue
+            future = executor.submit(
+                self._discover_tables, ws_id, ds["id"], ds["name"], headers
+            )
+            table_futures[future] = (ws_id, ds["id"], ds["name"])
+        return table_futures
+
+    def _submit_visual_discovery(
+        self,
+        fabric_executor: ThreadPoolExecutor,
+        ws_id: str,
+        reports: list,
+        selection: Optional[Tuple[Set[str], Set[str]]],
+        fabric_headers: dict,
+        definition_cache: Optional[DiskCache],
+    ) -> Dict[Future, Tuple[str, dict]]:
+        """Queue Fabric visual discovery for a workspace's (selected) reports."""
+        visual_futures: Dict[Future, Tuple[str, dict]] = {}
+        for report in reports:
+            if selection is not None and report["name"] not in selection[1]:
+                continue
+            if not report.get("datasetId"):
+                logger.debug(
+                    f"Report '{report['name']}' has no datasetId, skipping visuals"
+                )
+                continue
+            future = fabric_executor.submit(
+                self._discover_visuals,
+                ws_id, report, fabric_headers, definition_cache,
+            )
+            visual_futures[future] = (ws_id, report)
+        return visual_futures
+
+    def _collect_table_specs(
+        self,
+        table_futures: Dict[Future, Tuple[str, str, str]],
+        fabric_executor: ThreadPoolExecutor,
+        headers: dict,
+        fabric_headers: dict,
+        definition_cache: Optional[DiskCache],
+    ) -> List[dict]:
+        """Gather table specs, sending datasets REST could not describe to Fabric."""
+        table_specs: List[dict] = []
+        fabric_table_futures: Dict[Future, Tuple[str, str, str]] = {}
+        for future in as_completed(table_futures):
+            ws_id, ds_id, ds_name = table_futures[future]
+            tables = future.result()
+            if tables is None:
+                fabric_future = fabric_executor.submit(
+                    self._discover_tables_via_fabric_fallback,
+                    ws_id, ds_id, ds_name, headers, fabric_headers,
+                    definition_cache,
+                )
+                fabric_table_futures[fabric_future] = table_futures[future]
+                continue
+            table_specs.extend(_table_specs(ws_id, ds_id, ds_name, tables))
+
+        for future in as_completed(fabric_table_futures):
+            ws_id, ds_id, ds_name = fabric_table_futures[future]
+            table_specs.extend(_table_specs(ws_id, ds_id, ds_name, future.result()))
+        # Futures finish in any order; keep the catalog order stable across runs.
+        table_specs.sort(key=_TABLE_SPEC_ORDER)
+        return table_specs
+
+    def _collect_visual_specs(
+        self, visual_futures: Dict[Future, Tuple[str, dict]]
+    ) -> List[dict]:
+        """Gather visual stream specs from finished report discoveries."""
+        visual_specs: List[dict] = []
+        for future in as_completed(visual_futures):
+            ws_id, report = visual_futures[future]
+            for visual in future.result():
+                visual_specs.append({
+                    "workspace_id": ws_id,
+                    "dataset_id": report["datasetId"],
+                    "report_name": report["name"],
+                    "visual_title": visual["title"],
+                    "visual_type": visual["visual_type"],
+                    "dax_query": visual["dax_query"],
+                    "columns": visual["columns"],
+                })
+        # Sorting is stable, so visuals of one report keep their page order.
+        visual_specs.sort(key=_VISUAL_SPEC_ORDER)
+        return visual_specs
+
+    @property
+    def _fabric_poll_deadline(self) -> int:
+        return self.config.get("fabric_poll_deadline_seconds", DEFAULT_FABRIC_POLL_DEADLINE)
+
+    def _build_streams(self, discovered: dict) -> List[Stream]:
+        """Instantiate table and visual streams from discovered specs."""
+        streams: List[Stream] = [
+            TableDataStream(
+                tap=self,
+                name=f"{spec['dataset_name']} | table: {spec['table_name']}",
+                **spec,
+            )
+            for spec in discovered["tables"]
+        ]
+        streams.extend(
+            VisualDataStream(
+                tap=self,
+                name=f"{spec['report_name']} | visual: {spec['visual_title']}",
+                **spec,
+            )
+            for spec in discovered["visuals"]
+        )
         return streams
 
-    def _discover_datasets(self, ws_id: str, headers: dict) -> list:
+    def _discover_datasets(self, workspace: dict, headers: dict) -> list:
         """List datasets in a workspace."""
+        if "datasets" in workspace:  # already expanded by the admin API
+            return workspace["datasets"]
+        ws_id = workspace["id"]
         try:
-            resp = requests.get(f"{API_BASE}/groups/{ws_id}/datasets", headers=headers)
-            resp.raise_for_status()
-            return resp.json().get("value", [])
+            return _list_datasets(ws_id, headers)
         except Exception as e:
             logger.warning(f"Failed to list datasets for workspace {ws_id}: {e}")
+            self._discovery_complete = False
             return []
 
     def _discover_tables(self, ws_id: str, ds_id: str, ds_name: str,
-                         headers: dict, fabric_headers: dict) -> list:
-        """Discover tables for a dataset, trying REST then Fabric API."""
+                         headers: dict) -> Optional[list]:
+        """Discover tables for a dataset via REST.
+
+        Returns None when the dataset needs the Fabric fallback: REST rejected
+        it, or REST already rejected another dataset in the same workspace.
+        """
+        if ws_id in self._fabric_workspaces:
+            return None
         try:
             tables = _discover_tables_via_rest(ws_id, ds_id, headers)
             logger.info(f"Discovered {len(tables)} tables via REST for dataset {ds_name}")
             return tables
-        except Exception:
-            pass
+        except TablesNotAvailableError:
+            self._fabric_workspaces.add(ws_id)
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to discover tables for dataset {ds_name} ({ds_id}): {e}")
+            self._discovery_complete = False
+            return []
+
+    def _discover_tables_via_fabric_fallback(self, ws_id: str, ds_id: str, ds_name: str,
+                                             headers: dict, fabric_headers: dict,
+                                             definition_cache: Optional[DiskCache] = None
+                                             ) -> list:
+        """Discover tables for a dataset via Fabric getDefinition.
 
+        If Fabric fails, REST is tried once more: the dataset may be a push
+        dataset in a workspace whose other datasets sent it straight here.
+        """
         try:
-            tables = _discover_tables_via_fabric(ws_id, ds_id, fabric_headers)
+            tables = _discover_tables_via_fabric(
+                ws_id, ds_id, fabric_headers, definition_cache,
+                poll_deadline=self._fabric_poll_deadline,
+            )
             logger.info(f"Discovered {len(tables)} tables via Fabric for dataset {ds_name}")
             return tables
         except Exception as e:
-            logger.warning(f"Failed to discover tables for dataset {ds_name} ({ds_id}): {e}")
+            error = e
+
+        try:
+            tables = _discover_tables_via_rest(ws_id, ds_id, headers)
+            logger.info(f"Discovered {len(tables)} tables via REST for dataset {ds_name}")
+            return tables
+        except Exception:
+            logger.warning(
+                f"Failed to discover tables for dataset {ds_name} ({ds_id}): {error}"
+            )
+            self._discovery_complete = False
+            return []
+
+    def _discover_visuals(self, ws_id: str, report: dict, fabric_headers: dict,
+                          definition_cache: Optional[DiskCache] = None) -> list:
+        """Discover the visuals of a report via the Fabric API."""
+        try:
+            visuals = _discover_report_visuals(
+                ws_id, report["id"], fabric_headers, definition_cache,
+                poll_deadline=self._fabric_poll_deadline,
+            )
+            logger.info(f"Discovered {len(visuals)} visuals in report '{report['name']}'")
+            return visuals
+        except Exception as e:
+            logger.warning(
+                f"Failed to discover visuals for report '{report['name']}' ({report['id']}): {e}"
+            )
+            self._discovery_complete = False
             return []
 
-    def _discover_reports(self, ws_id: str, headers: dict) -> list:
+    def _discover_reports(self, workspace: dict, headers: dict) -> list:
         """List reports in a workspace."""
+        if "reports" in workspace:  # already expanded by the admin API
+            return workspace["reports"]
+        ws_id = workspace["id"]
         try:
-            resp = requests.get(f"{API_BASE}/groups/{ws_id}/reports", headers=headers)
-            resp.raise_for_status()
-            return resp.json().get("value", [])
+            return _list_reports(ws_id, headers)
         except Exception as e:
             logger.warning(f"Failed to list reports for workspace {ws_id}: {e}")
+            self._discovery_complete = False
             return []
 
 
@@ -0,0 +1,26 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+from tap_powerbi import auth, disk_cache, tap
+
+
+@pytest.fixture(autouse=True)
+def clear_discovery_caches():
+    """Keep memoized discovery results and tokens from leaking between tests."""
+    yield
+    auth._TOKEN_CACHE.clear()
+    tap._list_workspaces.cache_clear()
+    tap._list_workspaces_expanded.cache_clear()
+    tap._list_datasets.cache_clear()
+    tap._list_reports.cache_clear()
+    tap._discover_tables_via_rest.cache_clear()
+    tap._discover_tables_via_fabric.cache_clear()
+    tap._discover_report_visuals.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Point on-disk caches at a per-test directory instead of ~/.cache."""
+    monkeypatch.setattr(disk_cache, "DEFAULT_CACHE_DIR", tmp_path / "cache")
+    return tmp_path / "cache"
@@ -15,7 +15,7 @@ def test_get_access_token():
     mock_response.json.return_value = {"access_token": "fresh-token"}
     mock_response.raise_for_status = MagicMock()
 
-    with patch("tap_powerbi.auth.requests.post", return_value=mock_response) as mock_post:
+    with patch("tap_powerbi.auth.SESSION.post", return_value=mock_response) as mock_post:
         token = get_access_token(config)
 
     assert token == "fresh-token"
@@ -30,3 +30,65 @@ def test_get_access_token():
             "resource": "https://analysis.windows.net/powerbi/api",
         },
     )
+
+
+def _token_response(token, expires_in="3599"):
+    response = MagicMock()
+    response.json.return_value = {"access_token": token, "expires_in": expires_in}
+    response.raise_for_status = MagicMock()
+    return response
+
+
+def test_get_access_token_is_cached_per_resource():
+    config = {
+        "client_id": "test-client",
+        "client_secret": "test-secret",
+        "redirect_uri": "http://localhost",
+        "refresh_token": "test-refresh",
+    }
+    with patch(
+        "tap_powerbi.auth.SESSION.post",
+        side_effect=[_token_response("pbi-token"), _token_response("fabric-token")],
+    ) as mock_post:
+        assert get_access_token(config) == "pbi-token"
+        assert get_access_token(config) == "pbi-token"
+        assert get_access_token(config, resource="https://api.fabric.microsoft.com") == "fabric-token"
+
+    assert mock_post.call_count == 2
+
+
+def test_get_access_token_refreshes_near_expiry():
+    config = {
+        "client_id": "test-client",
+        "client_secret": "test-secret",
+        "redirect_uri": "http://localhost",
+        "refresh_token": "test-refresh",
+    }
+    with patch(
+        "tap_powerbi.auth.SESSION.post",
+        side_effect=[_token_response("short-lived", expires_in="60"), _token_response("renewed")],
+    ):
+        assert get_access_token(config) == "short-lived"
+        assert get_access_token(config) == "renewed"
+
+
+def test_stream_authenticator_reuses_discovery_token():
+    from tap_powerbi.auth import PowerBIAuthenticator
+
+    config = {
+        "client_id": "test-client",
+        "client_secret": "test-secret",
+        "redirect_uri": "http://localhost",
+        "refresh_token": "test-refresh",
+    }
+    authenticator = PowerBIAuthenticator.__new__(PowerBIAuthenticator)
+    authenticator._config = config
+    with patch(
+        "tap_powerbi.auth.SESSION.post", return_value=_token_response("shared-token")
+    ) as mock_post:
+        assert get_access_token(config) == "shared-token"
+        authenticator.update_access_token()
+
+    assert mock_post.call_count == 1
+    assert authenticator.access_token == "shared-token"
+    assert authenticator.is_token_valid()
@@ -0,0 +1,41 @@
+"""Tests for the on-disk discovery cache."""
+
+import os
+import time
+
+from tap_powerbi.disk_cache import DiskCache
+
+
+def test_round_trips_json_values(tmp_path):
+    cache = DiskCache("definitions", ttl=60, root=tmp_path)
+    cache.set("model-1", {"parts": [{"path": "a.tmdl"}]})
+    assert cache.get("model-1") == {"parts": [{"path": "a.tmdl"}]}
+    assert cache.get("model-2") is None
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = DiskCache("definitions", ttl=60, root=tmp_path)
+    cache.set("model-1", {"parts": []})
+    stale = time.time() - 120
+    os.utime(cache._path("model-1"), (stale, stale))
+    assert cache.get("model-1") is None
+
+
+def test_zero_ttl_disables_cache(tmp_path):
+    cache = DiskCache("definitions", ttl=0, root=tmp_path)
+    cache.set("model-1", {"parts": []})
+    assert cache.get("model-1") is None
+    assert not (tmp_path / "definitions").exists()
+
+
+def test_corrupt_entries_miss(tmp_path):
+    cache = DiskCache("definitions", ttl=60, root=tmp_path)
+    cache.set("model-1", {"parts": []})
+    cache._path("model-1").write_bytes(b"{not json")
+    assert cache.get("model-1") is None
+
+
+def test_defaults_to_shared_cache_dir(isolated_cache_dir):
+    cache = DiskCache("definitions", ttl=60)
+    cache.set("model-1", [])
+    assert (isolated_cache_dir / "definitions").is_dir()
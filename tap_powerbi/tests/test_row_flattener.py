@@ -40,3 +40,16 @@ def test_strips_bare_bracket_format():
 def test_mixed_visual_output():
     raw = {"MyTable[Col1]": "foo", "[Measure A]": 99.9, "plain": True}
     assert flatten_row(raw) == {"Col1": "foo", "Measure A": 99.9, "plain": True}
+
+
+def test_fast_path_matches_regex_edge_cases():
+    raw = {"T[]": 1, "[]": 2, "Tbl[Col[x]]": 3, "[A].[B]": 4, "]": 5}
+    assert flatten_row(raw) == {"T[]": 1, "[]": 2, "Col[x]": 3, "B": 4, "]": 5}
+
+
+def test_rows_sharing_a_shape_reuse_stripped_keys():
+    first = flatten_row({"T[A]": 1, "[B]": 2})
+    second = flatten_row({"T[A]": 3, "[B]": 4})
+    assert first == {"A": 1, "B": 2}
+    assert second == {"A": 3, "B": 4}
+    assert list(flatten_row({"[B]": 5, "T[A]": 6})) == ["B", "A"]
@@ -0,0 +1,113 @@
+"""Tests for the shared HTTP session."""
+
+from urllib3.util import Retry
+
+from tap_powerbi.session import (
+    RETRY_STATUSES,
+    SESSION,
+    STREAM_SESSION,
+    JitteredRetry,
+    build_session,
+)
+
+
+def test_https_adapter_retries_transient_statuses():
+    adapter = build_session().get_adapter("https://api.powerbi.com/v1.0/myorg")
+    assert set(adapter.max_retries.status_forcelist) == set(RETRY_STATUSES)
+    assert adapter.max_retries.total == 6
+    assert "POST" in adapter.max_retries.allowed_methods
+    assert adapter.max_retries.respect_retry_after_header
+
+
+def test_jittered_backoff_stays_within_one_second_of_base():
+    retry = JitteredRetry(total=6, backoff_factor=0.5)
+    retry = retry.increment(method="GET", url="/").increment(method="GET", url="/")
+    base = Retry(total=6, backoff_factor=0.5)
+    base = base.increment(method="GET", url="/").increment(method="GET", url="/")
+    assert base.get_backoff_time() <= retry.get_backoff_time() < base.get_backoff_time() + 1
+
+
+def test_module_session_is_shared():
+    from tap_powerbi import auth, tap
+
+    assert auth.SESSION is SESSION
+    assert tap.SESSION is SESSION
+
+
+def test_stream_session_only_retries_connections():
+    retry = STREAM_SESSION.get_adapter("https://api.powerbi.com").max_retries
+    assert retry.total == 3
+    assert not retry.status_forcelist
+
+
+def _mock_tap():
+    from unittest.mock import MagicMock
+
+    return MagicMock(config={}, state={}, metrics_logger=MagicMock())
+
+
+def test_streams_share_one_session():
+    from tap_powerbi.streams import DatasetsStream, WorkspacesStream
+
+    datasets = DatasetsStream(tap=_mock_tap())
+    workspaces = WorkspacesStream(tap=_mock_tap())
+    assert datasets.requests_session is workspaces.requests_session is STREAM_SESSION
+
+
+def test_stream_init_sets_the_same_attributes_as_rest_stream():
+    from singer_sdk.streams import RESTStream
+
+    from tap_powerbi.streams import WorkspacesStream
+
+    class PlainWorkspacesStream(RESTStream):
+        name = WorkspacesStream.name
+        path = WorkspacesStream.path
+        schema = WorkspacesStream.schema
+        url_base = WorkspacesStream.url_base
+
+    plain = PlainWorkspacesStream(tap=_mock_tap())
+    assert set(WorkspacesStream(tap=_mock_tap()).__dict__) == set(plain.__dict__)
+
+
+def test_sessions_request_every_supported_encoding():
+    from urllib3.util.request import ACCEPT_ENCODING
+
+    assert SESSION.headers["Accept-Encoding"] == ACCEPT_ENCODING
+    assert STREAM_SESSION.headers["Accept-Encoding"] == ACCEPT_ENCODING
+    assert "gzip" in ACCEPT_ENCODING
+
+
+def test_stream_construction_does_not_build_a_session():
+    from unittest.mock import patch
+
+    from tap_powerbi.streams import WorkspacesStream
+
+    with patch("requests.Session") as new_session:
+        stream = WorkspacesStream(tap=_mock_tap())
+    new_session.assert_not_called()
+    assert stream.requests_session is STREAM_SESSION
+
+
+def test_rate_limiter_spaces_request_starts():
+    from unittest.mock import patch
+
+    from tap_powerbi.session import RateLimiter
+
+    limiter = RateLimiter(rate=4)
+    with patch("tap_powerbi.session.time.monotonic", return_value=100.0), \
+            patch("tap_powerbi.session.time.sleep") as sleep:
+        for _ in range(3):
+            limiter.acquire()
+    assert [c.args[0] for c in sleep.call_args_list] == [0.25, 0.5]
+
+
+def test_rate_limiter_disabled_by_default():
+    from unittest.mock import patch
+
+    from tap_powerbi.session import RateLimiter
+
+    with patch("tap_powerbi.session.time.sleep") as sleep:
+        for _ in range(10):
+            RateLimiter().acquire()
+    sleep.assert_not_called()
+    assert SESSION.get_adapter("https://api.powerbi.com").rate_limiter.rate == 0
@@ -1,5 +1,13 @@
 """Tests for stream definitions."""
 
+import base64
+import codecs
+import time
+
+import orjson
+import pytest
+from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+
 from tap_powerbi.streams import WorkspacesStream, DatasetsStream, DatasetTablesStream, TableDataStream
 
 
@@ -43,6 +51,17 @@ def test_datasets_child_context():
     }
 
 
+def test_datasets_get_records_adds_workspace_fields():
+    stream = DatasetsStream.__new__(DatasetsStream)
+    stream.request_records = MagicMock(return_value=iter([{"id": "ds-1"}, {"id": "ds-2"}]))
+    context = {"workspace_id": "ws-1", "workspace_name": "Team Alpha"}
+    records = list(stream.get_records(context))
+    assert records == [
+        {"id": "ds-1", "workspace_id": "ws-1", "workspace_name": "Team Alpha"},
+        {"id": "ds-2", "workspace_id": "ws-1", "workspace_name": "Team Alpha"},
+    ]
+
+
 # --- DatasetTablesStream ---
 
 def test_dataset_tables_stream_attributes():
@@ -71,6 +90,23 @@ def test_dataset_tables_child_context():
     assert ctx["table_columns"] == record["columns"]
 
 
+def test_dataset_tables_get_records_reshapes_rows():
+    stream = DatasetTablesStream.__new__(DatasetTablesStream)
+    stream.request_records = MagicMock(
+        return_value=iter([{"name": "Items", "columns": [{"name": "Label"}]}])
+    )
+    context = {"workspace_id": "ws-1", "dataset_id": "ds-1", "dataset_name": "TestModel"}
+    assert list(stream.get_records(context)) == [
+        {
+            "workspace_id": "ws-1",
+            "dataset_id": "ds-1",
+            "dataset_name": "TestModel",
+            "table_name": "Items",
+            "columns": [{"name": "Label"}],
+        }
+    ]
+
+
 # --- TableDataStream ---
 
 def test_table_data_stream_schema():
@@ -102,11 +138,27 @@ def test_table_data_stream_payload():
     }
 
 
-def test_table_data_stream_post_process():
+def test_table_data_stream_parse_response():
     stream = TableDataStream.__new__(TableDataStream)
-    raw_row = {"[Items].[Label]": "foo", "[Items].[Value]": 42}
-    result = stream.post_process(raw_row, context=None)
-    assert result == {"Label": "foo", "Value": 42}
+    response = MagicMock()
+    response.content = codecs.BOM_UTF8 + orjson.dumps({
+        "results": [
+            {"tables": [{"rows": [{"[Items].[Label]": "a"}, {"[Items].[Label]": "b"}]}]},
+            {"tables": [{"rows": [{"[Items].[Label]": "c"}]}, {}]},
+        ]
+    })
+    rows = list(stream.parse_response(response))
+    assert rows == [{"Label": "a"}, {"Label": "b"}, {"Label": "c"}]
+
+
+def test_table_data_stream_parse_response_flattens_rows():
+    stream = TableDataStream.__new__(TableDataStream)
+    response = MagicMock()
+    response.content = orjson.dumps({
+        "results": [{"tables": [{"rows": [{"[Items].[Label]": "foo", "[Items].[Value]": 42}]}]}]
+    })
+    assert list(stream.parse_response(response)) == [{"Label": "foo", "Value": 42}]
+    assert stream.post_process({"Label": "foo"}, context=None) == {"Label": "foo"}
 
 
 from unittest.mock import patch, MagicMock
@@ -120,6 +172,11 @@ SAMPLE_CONFIG = {
 }
 
 
+def _set_json(mock_resp, body):
+    mock_resp.json.return_value = body
+    mock_resp.content = orjson.dumps(body)
+
+
 def mock_api_responses(*args, **kwargs):
     """Return mock API responses based on URL (REST /tables works)."""
     url = args[0] if args else kwargs.get("url", "")
@@ -128,15 +185,15 @@ def mock_api_responses(*args, **kwargs):
     mock_resp.raise_for_status = MagicMock()
 
     if "/groups" in url and "/datasets" not in url:
-        mock_resp.json.return_value = {
+        _set_json(mock_resp, {
             "value": [{"id": "ws-1", "name": "TestWorkspace"}]
-        }
+        })
     elif "/datasets" in url and "/tables" not in url:
-        mock_resp.json.return_value = {
+        _set_json(mock_resp, {
             "value": [{"id": "ds-1", "name": "TestModel"}]
-        }
+        })
     elif "/tables" in url:
-        mock_resp.json.return_value = {
+        _set_json(mock_resp, {
             "value": [
                 {
                     "name": "Items",
@@ -146,7 +203,7 @@ def mock_api_responses(*args, **kwargs):
                     ],
                 }
             ]
-        }
+        })
     return mock_resp
 
 
@@ -157,8 +214,8 @@ def _mock_auth_post():
     )
 
 
-@patch("tap_powerbi.auth.requests.post")
-@patch("tap_powerbi.tap.requests.get", side_effect=mock_api_responses)
+@patch("tap_powerbi.session.SESSION.post")
+@patch("tap_powerbi.session.SESSION.get", side_effect=mock_api_responses)
 def test_discover_streams_creates_dynamic_table_streams(mock_get, mock_auth_post):
     mock_auth_post.return_value = _mock_auth_post()
     tap = TapPowerBI(config=SAMPLE_CONFIG, parse_env_config=False)
@@ -175,8 +232,8 @@ def test_discover_streams_creates_dynamic_table_streams(mock_get, mock_auth_post
     assert "Value" in table_stream.schema["properties"]
 
 
-@patch("tap_powerbi.auth.requests.post")
-@patch("tap_powerbi.tap.requests.get")
+@patch("tap_powerbi.session.SESSION.post")
+@patch("tap_powerbi.session.SESSION.get")
 def test_discover_streams_handles_api_errors_gracefully(mock_get, mock_auth_post):
     """If workspace listing fails, we still get the 3 base streams."""
     mock_auth_post.return_value = _mock_auth_post()
@@ -192,7 +249,123 @@ def test_discover_streams_handles_api_errors_gracefully(mock_get, mock_auth_post
     assert len(streams) == 3  # no dynamic streams if discovery failed
 
 
-import base64
+def mock_api_responses_with_reports(*args, **kwargs):
+    url = args[0] if args else kwargs.get("url", "")
+    if url.endswith("/reports"):
+        mock_resp = MagicMock(status_code=200)
+        _set_json(mock_resp, {"value": [
+            {"id": "rpt-1", "name": "Sales", "datasetId": "ds-1"},
+            {"id": "rpt-2", "name": "Orphan"},
+        ]})
+        return mock_resp
+    return mock_api_responses(*args, **kwargs)
+
+
+@patch("tap_powerbi.tap._discover_report_visuals")
+@patch("tap_powerbi.session.SESSION.post")
+@patch("tap_powerbi.session.SESSION.get", side_effect=mock_api_responses_with_reports)
+def test_discover_streams_fans_out_report_visuals(mock_get, mock_auth_post, mock_visuals):
+    mock_auth_post.return_value = _mock_auth_post()
+    mock_visuals.return_value = [{
+        "title": "Revenue",
+        "visual_type": "card",
+        "dax_query": "EVALUATE ROW(\"Revenue\", 1)",
+        "columns": [{"name": "Revenue", "dataType": "Double"}],
+    }]
+    tap = TapPowerBI(config=SAMPLE_CONFIG, parse_env_config=False)
+
+    visual_stream = next(s for s in tap.discover_streams() if s.name == "Sales | visual: Revenue")
+    assert visual_stream._dataset_id == "ds-1"
+    assert {call.args[1] for call in mock_visuals.call_args_list} == {"rpt-1"}
+
+
+def _mock_report_definition_post(*args, **kwargs):
+    url = args[0] if args else kwargs.get("url", "")
+    if "/getDefinition" not in url:
+        return _mock_auth_post()
+    config = {
+        "name": "v1",
+        "singleVisual": {
+            "visualType": "card",
+            "prototypeQuery": {
+                "From": [{"Name": "s", "Entity": "Sales"}],
+                "Select": [{"Measure": {
+                    "Expression": {"SourceRef": {"Source": "s"}}, "Property": "Revenue",
+                }}],
+            },
+        },
+    }
+    report = {"sections": [{"visualContainers": [{"config": orjson.dumps(config).decode()}]}]}
+    mock_resp = MagicMock(status_code=200)
+    _set_json(mock_resp, {"definition": {"parts": [
+        {"path": "report.json", "payload": base64.b64encode(orjson.dumps(report)).decode()},
+    ]}})
+    return mock_resp
+
+
+@patch("tap_powerbi.session.SESSION.post", side_effect=_mock_report_definition_post)
+@patch("tap_powerbi.session.SESSION.get", side_effect=mock_api_responses_with_reports)
+def test_report_visual_discovery_is_memoized_across_runs(mock_get, mock_post):
+    config = {
+        **SAMPLE_CONFIG, "force_discovery": True, "definition_cache_ttl_seconds": 0,
+    }
+    TapPowerBI(config=config, parse_env_config=False)
+    tap = TapPowerBI(config=config, parse_env_config=False)
+
+    definition_posts = [c for c in mock_post.call_args_list if "/getDefinition" in c.args[0]]
+    assert len(definition_posts) == 1
+    assert "Sales | visual: v1" in tap.streams
+
+
+def _mock_admin_api_responses(*args, **kwargs):
+    url = args[0] if args else kwargs.get("url", "")
+    if "/admin/groups" in url:
+        mock_resp = MagicMock(status_code=200)
+        _set_json(mock_resp, {"value": [
+            {
+                "id": "ws-1",
+                "name": "TestWorkspace",
+                "state": "Active",
+                "type": "Workspace",
+                "datasets": [{"id": "ds-1", "name": "TestModel"}],
+                "reports": [],
+            },
+            {"id": "ws-2", "name": "Gone", "state": "Deleted", "type": "Workspace"},
+            {"id": "ws-3", "name": "Mine", "state": "Active", "type": "PersonalGroup"},
+        ]})
+        return mock_resp
+    return mock_api_responses(*args, **kwargs)
+
+
+@patch("tap_powerbi.session.SESSION.post")
+@patch("tap_powerbi.session.SESSION.get", side_effect=_mock_admin_api_responses)
+def test_admin_api_listing_skips_per_workspace_calls(mock_get, mock_auth_post):
+    mock_auth_post.return_value = _mock_auth_post()
+    config = {**SAMPLE_CONFIG, "use_admin_api": True}
+    tap = TapPowerBI(config=config, parse_env_config=False)
+
+    assert "TestModel | table: Items" in [s.name for s in tap.discover_streams()]
+    urls = [c.args[0] for c in mock_get.call_args_list]
+    assert not any(url.endswith(("/datasets", "/reports")) for url in urls)
+    assert not any("ws-2" in url or "ws-3" in url for url in urls)
+
+
+@patch("tap_powerbi.session.SESSION.post")
+@patch("tap_powerbi.session.SESSION.get")
+def test_admin_api_failure_falls_back_to_per_workspace_calls(mock_get, mock_auth_post):
+    from requests.exceptions import HTTPError
+
+    def responses(*args, **kwargs):
+        if "/admin/" in args[0]:
+            raise HTTPError("403 Forbidden")
+        return mock_api_responses(*args, **kwargs)
+
+    mock_auth_post.return_value = _mock_auth_post()
+    mock_get.side_effect = responses
+    config = {**SAMPLE_CONFIG, "use_admin_api": True}
+    tap = TapPowerBI(config=config, parse_env_config=False)
+
+    assert "TestModel | table: Items" in [s.name for s in tap.discover_streams()]
 
 
 def _encode_tmdl(text):
@@ -228,13 +401,13 @@ def _mock_fabric_fallback_get(*args, **kwargs):
     mock_resp.raise_for_status = MagicMock()
 
     if "/groups" in url and "/datasets" not in url:
-        mock_resp.json.return_value = {
+        _set_json(mock_resp, {
             "value": [{"id": "ws-1", "name": "TestWorkspace"}]
-        }
+        })
     elif "/datasets" in url and "/tables" not in url:
-        mock_resp.json.return_value = {
+        _set_json(mock_resp, {
             "value": [{"id": "ds-1", "name": "TestModel"}]
-        }
+        })
     elif "/tables" in url:
         from requests.exceptions import HTTPError
         mock_resp.status_code = 403
@@ -243,16 +416,16 @@ def _mock_fabric_fallback_get(*args, **kwargs):
 
 
 def _mock_fabric_fallback_post(*args, **kwargs):
-    """Mock for requests.post — handles auth and Fabric getDefinition."""
+    """Mock for SESSION.post — handles auth and Fabric getDefinition."""
     url = args[0] if args else kwargs.get("url", "")
     mock_resp = MagicMock()
     mock_resp.status_code = 200
     mock_resp.raise_for_status = MagicMock()
 
     if "login.microsoftonline.com" in url:
-        mock_resp.json.return_value = {"access_token": "tok"}
+        _set_json(mock_resp, {"access_token": "tok"})
     elif "/getDefinition" in url:
-        mock_resp.json.return_value = {
+        _set_json(mock_resp, {
             "definition": {
                 "parts": [
                     {
@@ -267,14 +440,13 @@ def _mock_fabric_fallback_post(*args, **kwargs):
                     },
                 ]
             }
-        }
+        })
     return mock_resp
 
 
-@patch("tap_powerbi.tap.requests.post", side_effect=_mock_fabric_fallback_post)
-@patch("tap_powerbi.tap.requests.get", side_effect=_mock_fabric_fallback_get)
-@patch("tap_powerbi.auth.requests.post", side_effect=_mock_fabric_fallback_post)
-def test_discover_streams_falls_back_to_fabric(mock_auth_post, mock_get, mock_tap_post):
+@patch("tap_powerbi.session.SESSION.post", side_effect=_mock_fabric_fallback_post)
+@patch("tap_powerbi.session.SESSION.get", side_effect=_mock_fabric_fallback_get)
+def test_discover_streams_falls_back_to_fabric(mock_get, mock_post):
     """When REST /tables returns 403, fall back to Fabric getDefinition."""
     tap = TapPowerBI(config=SAMPLE_CONFIG, parse_env_config=False)
     streams = tap.discover_streams()
@@ -287,3 +459,433 @@ def test_discover_streams_falls_back_to_fabric(mock_auth_post, mock_get, mock_ta
     table_stream = next(s for s in streams if s.name == "TestModel | table: Items")
     assert "Label" in table_stream.schema["properties"]
     assert "Value" in table_stream.schema["properties"]
+
+
+@patch("tap_powerbi.session.SESSION.post", side_effect=_mock_fabric_fallback_post)
+@patch("tap_powerbi.session.SESSION.get", side_effect=_mock_fabric_fallback_get)
+def test_fabric_definitions_are_cached_on_disk(mock_get, mock_post):
+    from tap_powerbi import tap as tap_module
+
+    # An expired catalog is rediscovered, but definitions are still reused.
+    config = {**SAMPLE_CONFIG, "discovery_ttl_seconds": 0}
+    TapPowerBI(config=config, parse_env_config=False)
+    tap_module._discover_tables_via_fabric.cache_clear()
+    tap = TapPowerBI(config=config, parse_env_config=False)
+
+    definition_posts = [c for c in mock_post.call_args_list if "/getDefinition" in c.args[0]]
+    assert len(definition_posts) == 1
+    assert definition_posts[0].kwargs["headers"] == {
+        "Authorization": "Bearer tok",
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+    }
+    assert "TestModel | table: Items" in [s.name for s in tap.discover_streams()]
+
+
+@patch("tap_powerbi.session.SESSION.post", side_effect=_mock_fabric_fallback_post)
+@patch("tap_powerbi.session.SESSION.get", side_effect=_mock_fabric_fallback_get)
+def test_force_discovery_skips_cached_definitions(mock_get, mock_post):
+    from tap_powerbi import tap as tap_module
+
+    TapPowerBI(config=SAMPLE_CONFIG, parse_env_config=False)
+    tap_module._discover_tables_via_fabric.cache_clear()
+    config = {**SAMPLE_CONFIG, "force_discovery": True}
+    tap = TapPowerBI(config=config, parse_env_config=False)
+
+    definition_posts = [c for c in mock_post.call_args_list if "/getDefinition" in c.args[0]]
+    assert len(definition_posts) == 2
+    assert "TestModel | table: Items" in tap.streams
+
+
+@patch("tap_powerbi.session.SESSION.post", side_effect=_mock_fabric_fallback_post)
+@patch("tap_powerbi.session.SESSION.get", side_effect=_mock_fabric_fallback_get)
+def test_cached_definitions_are_not_shared_between_principals(mock_get, mock_post):
+    from tap_powerbi import tap as tap_module
+
+    config = {**SAMPLE_CONFIG, "discovery_ttl_seconds": 0}
+    TapPowerBI(config=config, parse_env_config=False)
+    tap_module._discover_tables_via_fabric.cache_clear()
+    config = {**config, "refresh_token": "other-refresh-token"}
+    TapPowerBI(config=config, parse_env_config=False)
+
+    definition_posts = [c for c in mock_post.call_args_list if "/getDefinition" in c.args[0]]
+    assert len(definition_posts) == 2
+
+
+@patch("tap_powerbi.session.SESSION.post", side_effect=_mock_fabric_fallback_post)
+@patch("tap_powerbi.session.SESSION.get", side_effect=_mock_fabric_fallback_get)
+def test_fabric_table_discovery_is_memoized_across_runs(mock_get, mock_post):
+    config = {
+        **SAMPLE_CONFIG, "force_discovery": True, "definition_cache_ttl_seconds": 0,
+    }
+    TapPowerBI(config=config, parse_env_config=False)
+    tap = TapPowerBI(config=config, parse_env_config=False)
+
+    definition_posts = [c for c in mock_post.call_args_list if "/getDefinition" in c.args[0]]
+    assert len(definition_posts) == 1
+    assert "TestModel | table: Items" in tap.streams
+
+
+@patch("tap_powerbi.session.SESSION.post", side_effect=_mock_fabric_fallback_post)
+@patch("tap_powerbi.session.SESSION.get")
+def test_rest_server_errors_do_not_fall_back_to_fabric(mock_get, mock_post):
+    from requests.exceptions import HTTPError
+
+    def responses(*args, **kwargs):
+        mock_resp = _mock_fabric_fallback_get(*args, **kwargs)
+        if "/tables" in args[0]:
+            mock_resp.status_code = 500
+            mock_resp.raise_for_status.side_effect = HTTPError("500 Server Error")
+        return mock_resp
+
+    mock_get.side_effect = responses
+    tap = TapPowerBI(config=SAMPLE_CONFIG, parse_env_config=False)
+
+    assert len(tap.discover_streams()) == 3
+    assert not any("/getDefinition" in c.args[0] for c in mock_post.call_args_list)
+
+
+@patch("tap_powerbi.session.SESSION.post", side_effect=_mock_fabric_fallback_post)
+@patch("tap_powerbi.session.SESSION.get")
+def test_fabric_workspaces_skip_rest_for_later_datasets(mock_get, mock_post):
+    def responses(*args, **kwargs):
+        if args[0].endswith("/datasets"):
+            mock_resp = MagicMock(status_code=200)
+            _set_json(mock_resp, {"value": [
+                {"id": "ds-1", "name": "First"},
+                {"id": "ds-2", "name": "Second"},
+            ]})
+            return mock_resp
+        return _mock_fabric_fallback_get(*args, **kwargs)
+
+    mock_get.side_effect = responses
+    config = {**SAMPLE_CONFIG, "discovery_concurrency": 1}
+    tap = TapPowerBI(config=config, parse_env_config=False)
+
+    names = [s.name for s in tap.streams.values()]
+    assert "First | table: Items" in names
+    assert "Second | table: Items" in names
+    urls = [c.args[0] for c in mock_get.call_args_list]
+    assert sum("/tables" in url for url in urls) == 1
+
+
+@patch("tap_powerbi.session.SESSION.post")
+@patch("tap_powerbi.session.SESSION.get", side_effect=mock_api_responses)
+def test_discover_streams_memoizes_metadata_lookups(mock_get, mock_auth_post):
+    mock_auth_post.return_value = _mock_auth_post()
+    TapPowerBI(config=SAMPLE_CONFIG, parse_env_config=False).discover_streams()
+    TapPowerBI(config=SAMPLE_CONFIG, parse_env_config=False).discover_streams()
+
+    urls = [c.args[0] for c in mock_get.call_args_list]
+    assert urls.count("https://api.powerbi.com/v1.0/myorg/groups") == 1
+    assert sum("/tables" in url for url in urls) == 1
+    assert sum(url.endswith("/reports") for url in urls) == 1
+
+
+_CACHED_DISCOVERY = {
+    "client_id": "test",
+    "tables": [
+        {
+            "workspace_id": "ws-1",
+            "dataset_id": "ds-1",
+            "dataset_name": "CachedModel",
+            "table_name": "Items",
+            "columns": [{"name": "Label", "dataType": "String"}],
+        }
+    ],
+    "visuals": [],
+}
+
+
+@patch("tap_powerbi.session.SESSION.post")
+@patch("tap_powerbi.session.SESSION.get")
+def test_discover_streams_reuses_fresh_state_cache(mock_get, mock_post):
+    state = {"_discovery_cache": {**_CACHED_DISCOVERY, "generated_at": time.time()}}
+    tap = TapPowerBI(config=SAMPLE_CONFIG, state=state, parse_env_config=False)
+
+    assert "CachedModel | table: Items" in tap.streams
+    mock_get.assert_not_called()
+    mock_post.assert_not_called()
+
+
+@patch("tap_powerbi.session.SESSION.post")
+@patch("tap_powerbi.session.SESSION.get", side_effect=mock_api_responses)
+def test_discover_streams_reuses_catalog_cached_on_disk(mock_get, mock_auth_post):
+    from tap_powerbi import auth
+
+    mock_auth_post.return_value = _mock_auth_post()
+    TapPowerBI(config=SAMPLE_CONFIG, parse_env_config=False)
+    auth._TOKEN_CACHE.clear()
+
+    tap = TapPowerBI(config=SAMPLE_CONFIG, parse_env_config=False)
+
+    assert mock_auth_post.call_count == 2  # only the first run discovered
+    assert "TestModel | table: Items" in [s.name for s in tap.streams.values()]
+    other_user = {**SAMPLE_CONFIG, "refresh_token": "other"}
+    TapPowerBI(config=other_user, parse_env_config=False)
+    assert mock_auth_post.call_count == 4
+
+
+@patch("tap_powerbi.session.SESSION.post")
+@patch("tap_powerbi.session.SESSION.get", side_effect=mock_api_responses)
+def test_discover_streams_ignores_stale_state_cache(mock_get, mock_auth_post):
+    mock_auth_post.return_value = _mock_auth_post()
+    state = {"_discovery_cache": {**_CACHED_DISCOVERY, "generated_at": time.time() - 7200}}
+    tap = TapPowerBI(config=SAMPLE_CONFIG, state=state, parse_env_config=False)
+
+    assert "TestModel | table: Items" in tap.streams
+    assert "CachedModel | table: Items" not in tap.streams
+    cached = tap.state["_discovery_cache"]
+    assert [t["dataset_name"] for t in cached["tables"]] == ["TestModel"]
+
+
+def _mock_api_responses_reports_fail(*args, **kwargs):
+    url = args[0] if args else kwargs.get("url", "")
+    if url.endswith("/reports"):
+        raise Exception("503 Service Unavailable")
+    return mock_api_responses(*args, **kwargs)
+
+
+@patch("tap_powerbi.session.SESSION.post")
+@patch("tap_powerbi.session.SESSION.get", side_effect=_mock_api_responses_reports_fail)
+def test_incomplete_discovery_is_not_cached_in_state(mock_get, mock_auth_post):
+    mock_auth_post.return_value = _mock_auth_post()
+    tap = TapPowerBI(config=SAMPLE_CONFIG, parse_env_config=False)
+
+    assert "TestModel | table: Items" in tap.streams
+    assert "_discovery_cache" not in tap.state
+
+
+@patch("tap_powerbi.session.SESSION.post")
+@patch("tap_powerbi.session.SESSION.get", side_effect=_mock_api_responses_reports_fail)
+def test_incomplete_discovery_is_not_cached_on_disk(mock_get, mock_auth_post):
+    mock_auth_post.return_value = _mock_auth_post()
+    tap = TapPowerBI(config=SAMPLE_CONFIG, parse_env_config=False)
+
+    assert tap._catalog_cache().get(tap._catalog_cache_key()) is None
+
+
+# --- validate_response ---
+
+
+@pytest.mark.parametrize(
+    "status, error",
+    [(200, None), (404, FatalAPIError), (429, RetriableAPIError), (503, RetriableAPIError)],
+)
+def test_validate_response_classifies_status(status, error):
+    stream = WorkspacesStream.__new__(WorkspacesStream)
+    response = MagicMock(status_code=status, reason="", url="https://example")
+    if error is None:
+        stream.validate_response(response)
+    else:
+        with pytest.raises(error):
+            stream.validate_response(response)
+
+
+def _poll_response(status, retry_after=None):
+    resp = MagicMock(status_code=200)
+    resp.headers = {"Retry-After": retry_after} if retry_after else {}
+    _set_json(resp, {"status": status, "definition": {"parts": []}})
+    return resp
+
+
+@patch("tap_powerbi.tap.time.sleep")
+@patch("tap_powerbi.session.SESSION.get")
+def test_poll_fabric_operation_backs_off_up_to_retry_after(mock_get, mock_sleep):
+    from tap_powerbi.tap import _poll_fabric_operation
+
+    mock_get.side_effect = [_poll_response("Running")] * 8 + [
+        _poll_response("Succeeded"),
+        _poll_response("Succeeded"),
+    ]
+    initial = MagicMock(headers={"Location": "https://op", "x-ms-operation-id": "op-1",
+                                 "Retry-After": "5"})
+
+    assert _poll_fabric_operation(initial, {}) == {"parts": []}
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+    assert delays[0] == 0.5
+    assert delays == sorted(delays)
+    assert max(delays) == 5
+
+
+@patch("tap_powerbi.tap.ThreadPoolExecutor")
+@patch("tap_powerbi.session.SESSION.post", side_effect=_mock_fabric_fallback_post)
+@patch("tap_powerbi.session.SESSION.get", side_effect=_mock_fabric_fallback_get)
+def test_fabric_calls_run_on_their_own_pool(mock_get, mock_post, mock_executor):
+    from concurrent.futures import ThreadPoolExecutor
+
+    mock_executor.side_effect = ThreadPoolExecutor
+    config = {**SAMPLE_CONFIG, "discovery_concurrency": 2, "fabric_concurrency": 5}
+    tap = TapPowerBI(config=config, parse_env_config=False)
+
+    assert "TestModel | table: Items" in [s.name for s in tap.streams.values()]
+    assert [c.kwargs["max_workers"] for c in mock_executor.call_args_list] == [2, 5]
+
+
+def _operation_response(retry_after="5"):
+    return MagicMock(headers={"Location": "https://op", "x-ms-operation-id": "op-1",
+                              "Retry-After": retry_after})
+
+
+@patch("tap_powerbi.tap.time.sleep")
+@patch("tap_powerbi.session.SESSION.get")
+def test_poll_fabric_operation_stops_at_deadline(mock_get, mock_sleep):
+    from tap_powerbi.tap import _poll_fabric_operation
+
+    mock_get.return_value = _poll_response("Running")
+    clock = iter(range(0, 1000, 10))
+    with patch("tap_powerbi.tap.time.monotonic", side_effect=lambda: next(clock)):
+        with pytest.raises(TimeoutError, match="within 30s"):
+            _poll_fabric_operation(_operation_response(), {}, deadline_seconds=30)
+    assert mock_get.call_count < 4
+
+
+class _FakeClock:
+    """Stands in for time.monotonic/time.sleep; sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _running_response(percent):
+    resp = MagicMock(status_code=200, headers={})
+    _set_json(resp, {"status": "Running", "percentComplete": percent})
+    return resp
+
+
+@patch("tap_powerbi.session.SESSION.get")
+def test_poll_fabric_operation_aborts_when_progress_stalls(mock_get):
+    from tap_powerbi.tap import MIN_STALL_SECONDS, _poll_fabric_operation
+
+    clock = _FakeClock()
+    mock_get.return_value = _running_response(40)
+    with patch("tap_powerbi.tap.time.monotonic", clock.monotonic), \
+            patch("tap_powerbi.tap.time.sleep", clock.sleep):
+        with pytest.raises(TimeoutError, match="stalled at 40%"):
+            _poll_fabric_operation(_operation_response(), {})
+    assert MIN_STALL_SECONDS <= clock.now < 60
+
+
+@patch("tap_powerbi.session.SESSION.get")
+def test_poll_fabric_operation_waits_out_slow_progress(mock_get):
+    from tap_powerbi.tap import _poll_fabric_operation
+
+    clock = _FakeClock()
+
+    def responses(*args, **kwargs):
+        # Stuck at 50% for 20s, then done: slow, but not stalled.
+        if clock.now < 20:
+            return _running_response(50)
+        return _poll_response("Succeeded")
+
+    mock_get.side_effect = responses
+    with patch("tap_powerbi.tap.time.monotonic", clock.monotonic), \
+            patch("tap_powerbi.tap.time.sleep", clock.sleep):
+        assert _poll_fabric_operation(_operation_response(), {}) == {"parts": []}
+    assert clock.now >= 20
+
+
+def _catalog(selected_streams, unselected_streams=()):
+    def entry(name, selected):
+        return {
+            "tap_stream_id": name,
+            "stream": name,
+            "schema": {"type": "object", "properties": {}},
+            "metadata": [{"breadcrumb": [], "metadata": {"selected": selected}}],
+        }
+
+    return {"streams": [entry(name, True) for name in selected_streams]
+            + [entry(name, False) for name in unselected_streams]}
+
+
+@patch("tap_powerbi.session.SESSION.post")
+@patch("tap_powerbi.session.SESSION.get")
+def test_discovery_is_limited_to_selected_datasets(mock_get, mock_auth_post):
+    from tap_powerbi.tap import DISCOVERY_STATE_KEY
+
+    def responses(*args, **kwargs):
+        if args[0].endswith("/datasets"):
+            mock_resp = MagicMock(status_code=200)
+            _set_json(mock_resp, {"value": [
+                {"id": "ds-1", "name": "TestModel"},
+                {"id": "ds-2", "name": "Other"},
+            ]})
+            return mock_resp
+        return mock_api_responses(*args, **kwargs)
+
+    mock_auth_post.return_value = _mock_auth_post()
+    mock_get.side_effect = responses
+    catalog = _catalog(["TestModel | table: Items"], ["Other | table: Items"])
+    tap = TapPowerBI(config=SAMPLE_CONFIG, catalog=catalog, parse_env_config=False)
+
+    assert "TestModel | table: Items" in tap.streams
+    assert "Other | table: Items" not in tap.streams
+    urls = [c.args[0] for c in mock_get.call_args_list]
+    assert [url for url in urls if url.endswith("/tables")] == [
+        "https://api.powerbi.com/v1.0/myorg/groups/ws-1/datasets/ds-1/tables"
+    ]
+    assert not any(url.endswith("/reports") for url in urls)
+    assert DISCOVERY_STATE_KEY not in tap.state
+
+
+@patch("tap_powerbi.tap.time.sleep")
+@patch("tap_powerbi.session.SESSION.get")
+def test_poll_fabric_operation_follows_result_location(mock_get, mock_sleep):
+    from tap_powerbi.tap import _poll_fabric_operation
+
+    succeeded = _poll_response("Succeeded")
+    succeeded.headers = {"Location": "https://op/result"}
+    mock_get.side_effect = [succeeded, _poll_response("Succeeded")]
+
+    assert _poll_fabric_operation(_operation_response(), {}) == {"parts": []}
+    assert mock_get.call_args_list[-1].args[0] == "https://op/result"
+
+
+@patch("tap_powerbi.session.SESSION.post")
+def test_get_fabric_definition_rejects_other_success_statuses(mock_post):
+    from tap_powerbi.tap import _get_fabric_definition
+
+    mock_post.return_value = MagicMock(status_code=204)
+    with pytest.raises(RuntimeError, match="status 204"):
+        _get_fabric_definition("https://def/getDefinition", {})
+
+
+def test_collected_specs_are_sorted_regardless_of_completion_order():
+    from concurrent.futures import Future
+
+    def done(result):
+        future = Future()
+        future.set_result(result)
+        return future
+
+    tap = TapPowerBI.__new__(TapPowerBI)
+    table_futures = {
+        done([{"name": "B"}, {"name": "A"}]): ("ws-2", "ds-1", "Sales"),
+        done([{"name": "Z"}]): ("ws-1", "ds-2", "Orders"),
+        done([{"name": "Y"}]): ("ws-1", "ds-3", "Finance"),
+    }
+    specs = tap._collect_table_specs(table_futures, None, {}, {}, None)
+    assert [(s["workspace_id"], s["dataset_name"], s["table_name"]) for s in specs] == [
+        ("ws-1", "Finance", "Y"),
+        ("ws-1", "Orders", "Z"),
+        ("ws-2", "Sales", "A"),
+        ("ws-2", "Sales", "B"),
+    ]
+
+    def visual(title):
+        return {"title": title, "visual_type": "card", "dax_query": "", "columns": []}
+
+    visual_futures = {
+        done([visual("Second"), visual("First")]): ("ws-1", {"name": "R2", "datasetId": "d"}),
+        done([visual("Only")]): ("ws-1", {"name": "R1", "datasetId": "d"}),
+    }
+    specs = tap._collect_visual_specs(visual_futures)
+    assert [(s["report_name"], s["visual_title"]) for s in specs] == [
+        ("R1", "Only"), ("R2", "First"), ("R2", "Second"),
+    ]
@@ -157,6 +157,19 @@ table Items
     assert result["columns"][0]["dataType"] == "String"
 
 
+def test_type_names_are_case_insensitive():
+    tmdl = """\
+table Items
+
+    column A
+        dataType: Int64
+    column B
+        dataType: DATETIME
+"""
+    result = parse_tmdl_table(tmdl)
+    assert [c["dataType"] for c in result["columns"]] == ["Int64", "DateTime"]
+
+
 def test_returns_none_for_empty_text():
     assert parse_tmdl_table("") is None
     assert parse_tmdl_table("/// just a comment") is None
@@ -176,6 +189,20 @@ table Items
     assert result["columns"][0]["name"] == "Label"
 
 
+def test_only_exact_keywords_are_classified():
+    tmdl = """\
+table Items
+    isHiddenInReport
+
+    column Label
+        dataType:string
+        isHiddenFlag
+"""
+    result = parse_tmdl_table(tmdl)
+    assert result["isHidden"] is False
+    assert result["columns"] == [{"name": "Label", "dataType": "String"}]
+
+
 # --- tables_from_definition ---
 
 def _encode(text: str) -> str:
@@ -252,3 +279,36 @@ def test_tables_from_definition_ignores_non_table_parts():
     }
     tables = tables_from_definition(definition)
     assert tables == []
+
+
+def _large_table(header: str) -> str:
+    columns = "".join(
+        f"    column Col{i}\n        dataType: string\n        sourceColumn: Col{i}\n\n"
+        for i in range(50)
+    )
+    return header + "\n" + columns
+
+
+def test_hidden_large_tables_are_skipped_without_full_parse():
+    from unittest.mock import patch
+
+    definition = {
+        "parts": [
+            {
+                "path": "definition/tables/Hidden.tmdl",
+                "payload": _encode(_large_table("/// Helper\ntable Hidden\n    isHidden\n")),
+            },
+            {
+                "path": "definition/tables/Visible.tmdl",
+                "payload": _encode(_large_table("table Visible\n    column Secret\n        isHidden\n")),
+            },
+        ]
+    }
+    with patch(
+        "tap_powerbi.tmdl_parser.parse_tmdl_table", side_effect=parse_tmdl_table
+    ) as parse:
+        tables = tables_from_definition(definition)
+
+    assert [t["name"] for t in tables] == ["Visible"]
+    assert len(tables[0]["columns"]) == 50
+    assert parse.call_count == 1
@@ -54,3 +54,12 @@ def test_build_schema_from_columns():
 def test_build_schema_empty_columns():
     schema = build_schema_from_columns([])
     assert schema == {"type": "object", "properties": {}}
+
+
+def test_build_schema_reuses_cached_build_per_column_shape():
+    columns = [{"name": "Region", "dataType": "String"}]
+    first = build_schema_from_columns(columns)
+    second = build_schema_from_columns([dict(col) for col in columns])
+    assert first == second
+    first["properties"]["Extra"] = {"type": ["string", "null"]}
+    assert "Extra" not in build_schema_from_columns(columns)["properties"]
@@ -84,12 +84,35 @@ def test_extract_title_from_literal():
     assert _extract_title(sv) == "My Title"
 
 
+def test_extract_title_strips_every_surrounding_quote():
+    # Titles become stream names, so they must match the old strip("'").
+    sv = {"objects": {"title": [{"properties": {"text": {"expr": {"Literal": {"Value": "'Sales ''24'''"}}}}}]}}
+    assert _extract_title(sv) == "Sales ''24"
+
+
+def test_extract_title_unquoted_literal():
+    sv = {"objects": {"title": [{"properties": {"text": {"expr": {"Literal": {"Value": "Plain"}}}}}]}}
+    assert _extract_title(sv) == "Plain"
+
+
 def test_extract_title_missing():
     assert _extract_title({}) == ""
     assert _extract_title({"objects": {}}) == ""
     assert _extract_title({"objects": {"title": []}}) == ""
 
 
+def test_extract_title_malformed_objects():
+    assert _extract_title({"objects": []}) == ""
+    assert _extract_title({"objects": {"title": {"properties": {}}}}) == ""
+    assert _extract_title({"objects": {"title": ["text"]}}) == ""
+    assert _extract_title({"objects": {"title": [{"properties": {"text": "x"}}]}}) == ""
+
+
+def test_extract_title_without_text_literal():
+    assert _extract_title({"objects": {"title": [{"properties": {"show": True}}]}}) == ""
+    assert _extract_title({"objects": {"title": [{"properties": {"text": {"expr": {}}}}]}}) == ""
+
+
 # ---------------------------------------------------------------------------
 # _prototype_to_dax
 # ---------------------------------------------------------------------------
@@ -262,6 +285,17 @@ def test_skips_image():
     assert visuals_from_report_definition(_make_report_definition([vc])) == []
 
 
+def test_skips_compact_config_without_parsing():
+    report_json = {"sections": [{"visualContainers": [
+        {"config": '{"name":"s1","singleVisual":{"visualType":"slicer",<truncated'},
+    ]}]}
+    definition = {"parts": [{
+        "path": "report.json",
+        "payload": base64.b64encode(json.dumps(report_json).encode()).decode(),
+    }]}
+    assert visuals_from_report_definition(definition) == []
+
+
 def test_empty_definition():
     assert visuals_from_report_definition({}) == []
     assert visuals_from_report_definition({"parts": []}) == []
@@ -15,13 +15,36 @@ _TMDL_TYPE_MAP = {
     "decimal": "Decimal",
     "boolean": "Boolean",
     "datetime": "DateTime",
+    "dateTime": "DateTime",  # TMDL's own spelling, so it hits without lowering
     "binary": "String",
 }
 
 
+# Classifies a stripped TMDL line in one match; dispatch on ``lastindex``.
+_LINE_RE = re.compile(
+    r"(table )"
+    r"|(column )"
+    r"|(measure |partition |hierarchy |annotation |calculationGroup)"
+    r"|dataType:(.*)"
+    r"|(isHidden)$"
+)
+_TABLE, _COLUMN, _CHILD, _DATA_TYPE, _IS_HIDDEN = range(1, 6)
+
+# Base64 characters decoded to probe a table part for a hidden table (a
+# multiple of 4, so it decodes without padding): 384 bytes of TMDL.
+_HEAD_PROBE_CHARS = 512
+
+
 def _tmdl_type_to_powerbi_type(tmdl_type: str) -> str:
-    """Convert a TMDL dataType value to a Power BI type name."""
-    return _TMDL_TYPE_MAP.get(tmdl_type.lower(), "String")
+    """Convert a TMDL dataType value to a Power BI type name.
+
+    The exact spelling is tried first; only unusual casings pay for a
+    ``lower()`` copy.
+    """
+    powerbi_type = _TMDL_TYPE_MAP.get(tmdl_type)
+    if powerbi_type is None:
+        powerbi_type = _TMDL_TYPE_MAP.get(tmdl_type.lower(), "String")
+    return powerbi_type
 
 
 def _unquote_tmdl_name(name: str) -> str:
@@ -43,65 +66,90 @@ def parse_tmdl_table(tmdl_text: str) -> dict | None:
     table_hidden = False
     columns: list[dict] = []
 
-    # State tracking for the current child object.
+    # State tracking for the current child object.  Kept in plain locals
+    # (no flush closure) so the per-line loop avoids closure-cell access.
     in_column = False
     col_name: str | None = None
     col_type = "String"
     col_hidden = False
 
-    def _flush_column():
-        nonlocal col_name, col_type, col_hidden, in_column
-        if in_column and col_name and not col_hidden:
-            columns.append({"name": col_name, "dataType": col_type})
-        in_column = False
-        col_name = None
-        col_type = "String"
-        col_hidden = False
-
     for line in lines:
         stripped = line.strip()
-        if not stripped or stripped.startswith("///"):
+        match = _LINE_RE.match(stripped)
+        if match is None:
             continue
+        kind = match.lastindex
 
         # Table declaration (always at root level, no indent).
-        if stripped.startswith("table "):
+        if kind == _TABLE:
             table_name = _unquote_tmdl_name(stripped[6:])
-            continue
 
-        # Column declaration.
-        if stripped.startswith("column "):
-            _flush_column()
-            in_column = True
-            col_decl = stripped[7:].strip()
-            # Calculated columns: `column 'Name' = EXPRESSION`
-            col_name = _unquote_tmdl_name(col_decl.split("=")[0])
+        # Column declarations and other child objects end the current column.
+        elif kind == _COLUMN or kind == _CHILD:
+            if in_column and col_name and not col_hidden:
+                columns.append({"name": col_name, "dataType": col_type})
+            in_column = kind == _COLUMN
             col_type = "String"
             col_hidden = False
-            continue
-
-        # Other child objects end column context.
-        if stripped.startswith(
-            ("measure ", "partition ", "hierarchy ", "annotation ", "calculationGroup")
-        ):
-            _flush_column()
-            continue
+            if in_column:
+                # Calculated columns: `column 'Name' = EXPRESSION`
+                col_name = _unquote_tmdl_name(stripped[7:].partition("=")[0])
+            else:
+                col_name = None
 
         # Properties.
-        if in_column:
-            if stripped.startswith("dataType:"):
-                col_type = _tmdl_type_to_powerbi_type(stripped.split(":", 1)[1].strip())
-            elif stripped == "isHidden":
+        elif in_column:
+            if kind == _DATA_TYPE:
+                col_type = _tmdl_type_to_powerbi_type(match[_DATA_TYPE].strip())
+            else:
                 col_hidden = True
-        elif table_name is not None and stripped == "isHidden":
+        elif table_name is not None and kind == _IS_HIDDEN:
             table_hidden = True
 
-    _flush_column()
+    if in_column and col_name and not col_hidden:
+        columns.append({"name": col_name, "dataType": col_type})
 
     if table_name is None:
         return None
     return {"name": table_name, "columns": columns, "isHidden": table_hidden}
 
 
+def _is_table_part(part: dict) -> bool:
+    path = part.get("path", "")
+    return path.startswith("definition/tables/") and path.endswith(".tmdl")
+
+
+def _head_declares_hidden(payload: str) -> bool:
+    """Check whether a base64 TMDL table part declares a hidden table.
+
+    Decodes only the first few hundred bytes: TMDL puts a table's own
+    ``isHidden`` before its first child object.  Returns True only when the
+    full parse would also mark the table hidden; anything unclear is False.
+    """
+    if len(payload) <= _HEAD_PROBE_CHARS:
+        return False  # small enough to just parse
+    head = base64.b64decode(payload[:_HEAD_PROBE_CHARS]).decode("utf-8", "ignore")
+    seen_table = False
+    for line in head.split("\n")[:-1]:  # the last line may be cut off
+        match = _LINE_RE.match(line.strip())
+        if match is None:
+            continue
+        kind = match.lastindex
+        if kind == _TABLE:
+            seen_table = True
+        elif kind == _IS_HIDDEN:
+            if seen_table:
+                return True
+        elif kind == _COLUMN or kind == _CHILD:
+            return False
+    return False
+
+
+def _decode_and_parse(payload: str) -> dict | None:
+    """Decode one base64 TMDL table payload and parse it."""
+    return parse_tmdl_table(base64.b64decode(payload).decode("utf-8"))
+
+
 def tables_from_definition(definition: dict) -> list[dict]:
     """Extract visible tables from a Fabric getDefinition response.
 
@@ -111,16 +159,15 @@ def tables_from_definition(definition: dict) -> list[dict]:
     Returns a list of dicts compatible with the REST ``/tables`` format:
     ``[{"name": "...", "columns": [{"name": "...", "dataType": "..."}]}]``
     """
+    payloads = [
+        part["payload"] for part in definition.get("parts", [])
+        if _is_table_part(part) and not _head_declares_hidden(part["payload"])
+    ]
     tables: list[dict] = []
-    for part in definition.get("parts", []):
-        path = part.get("path", "")
-        if not (path.startswith("definition/tables/") and path.endswith(".tmdl")):
-            continue
-        payload = base64.b64decode(part["payload"]).decode("utf-8")
-        table = parse_tmdl_table(payload)
-        if table and not table.get("isHidden", False):
+    for table in map(_decode_and_parse, payloads):
+        if table and not table["isHidden"]:
             tables.append({
                 "name": table["name"],
-                "columns": table.get("columns", []),
+                "columns": table["columns"],
             })
     return tables
@@ -1,5 +1,7 @@
 """Map Power BI column data types to JSON Schema types."""
 
+from functools import lru_cache
+
 POWERBI_TYPE_MAP = {
     "String": {"type": ["string", "null"]},
     "Int64": {"type": ["number", "null"]},
@@ -9,18 +11,31 @@ POWERBI_TYPE_MAP = {
     "DateTime": {"type": ["string", "null"], "format": "date-time"},
 }
 
+# Unknown Power BI types are extracted as strings.
+DEFAULT_JSONSCHEMA_TYPE = {"type": ["string", "null"]}
+
 
 def powerbi_type_to_jsonschema(powerbi_type: str) -> dict:
     """Convert a Power BI column data type to a JSON Schema type definition."""
-    return POWERBI_TYPE_MAP.get(powerbi_type, {"type": ["string", "null"]})
+    return POWERBI_TYPE_MAP.get(powerbi_type, DEFAULT_JSONSCHEMA_TYPE)
 
 
 def build_schema_from_columns(columns: list) -> dict:
     """Build a JSON Schema object from a list of Power BI column definitions.
 
-    Each column dict has keys: 'name' and 'dataType'.
+    Each column dict has keys: 'name' and 'dataType'.  Schemas are cached by
+    column shape, so datasets that repeat the same tables share one build;
+    each caller gets its own top-level dicts to mutate.
     """
-    properties = {}
-    for col in columns:
-        properties[col["name"]] = powerbi_type_to_jsonschema(col["dataType"])
+    key = tuple((col["name"], col["dataType"]) for col in columns)
+    schema = _build_schema_cached(key)
+    return {"type": "object", "properties": dict(schema["properties"])}
+
+
+@lru_cache(maxsize=4096)
+def _build_schema_cached(columns: tuple) -> dict:
+    lookup = POWERBI_TYPE_MAP.get
+    properties = {
+        name: lookup(data_type, DEFAULT_JSONSCHEMA_TYPE) for name, data_type in columns
+    }
     return {"type": "object", "properties": properties}
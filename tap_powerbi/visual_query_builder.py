@@ -6,11 +6,24 @@ visual renders in Power BI.
 """
 
 import base64
-import json
 import logging
 
+import orjson
+
+from tap_powerbi.jsonutil import load_json
+
 logger = logging.getLogger(__name__)
 
+# prototypeQuery aggregation function ids; unknown ids fall back to SUM.
+_AGG_FUNCS = {0: "SUM", 1: "AVG", 2: "COUNT", 3: "MIN", 4: "MAX"}
+
+# Visuals that render no queryable data.
+_SKIP_VISUAL_TYPES = frozenset({"slicer", "textbox", "shape", "image", "actionButton"})
+
+# Power BI serialises visual configs as compact JSON, so a skipped visual's
+# config contains one of these verbatim and can be dropped unparsed.
+_SKIP_VISUAL_PROBES = tuple(f'"visualType":"{t}"' for t in _SKIP_VISUAL_TYPES)
+
 
 def visuals_from_report_definition(definition: dict) -> list[dict]:
     """Extract visual metadata from a Fabric report getDefinition response.
@@ -22,9 +35,7 @@ def visuals_from_report_definition(definition: dict) -> list[dict]:
     report_json = None
     for part in definition.get("parts", []):
         if part.get("path") == "report.json":
-            report_json = json.loads(
-                base64.b64decode(part["payload"]).decode("utf-8")
-            )
+            report_json = load_json(base64.b64decode(part["payload"]))
             break
 
     if not report_json:
@@ -34,27 +45,28 @@ def visuals_from_report_definition(definition: dict) -> list[dict]:
     for section in report_json.get("sections", []):
         page_name = section.get("displayName", "Page")
         for vc in section.get("visualContainers", []):
-            config = json.loads(vc.get("config", "{}"))
+            raw_config = vc.get("config", "{}")
+            if any(probe in raw_config for probe in _SKIP_VISUAL_PROBES):
+                continue
+            config = orjson.loads(raw_config)
             sv = config.get("singleVisual", {})
             if not sv:
                 continue
 
             visual_type = sv.get("visualType", "unknown")
+            # Skip non-data visuals
+            if visual_type in _SKIP_VISUAL_TYPES:
+                continue
+
             visual_name = config.get("name", "unnamed")
             title = _extract_title(sv) or visual_name
             proto = sv.get("prototypeQuery", {})
 
-            # Skip non-data visuals
-            if visual_type in ("slicer", "textbox", "shape", "image", "actionButton"):
-                continue
-
-            dax = _prototype_to_dax(proto, visual_type)
+            dax, columns = _build_dax_and_columns(proto, visual_type)
             if not dax:
                 logger.debug(f"Could not build DAX for visual '{title}' ({visual_type})")
                 continue
 
-            columns = _infer_columns_from_proto(proto)
-
             visuals.append({
                 "name": visual_name,
                 "title": title,
@@ -69,77 +81,91 @@ def visuals_from_report_definition(definition: dict) -> list[dict]:
 
 def _extract_title(single_visual: dict) -> str:
     """Pull the title text from a visual's objects, if set."""
+    # Most visuals have no title; walk with .get so that path never raises.
+    # The except only catches malformed title objects.
     try:
-        title_props = single_visual["objects"]["title"][0]["properties"]
-        return title_props["text"]["expr"]["Literal"]["Value"].strip("'")
-    except (KeyError, IndexError, TypeError):
+        titles = (single_visual.get("objects") or {}).get("title")
+        if not titles:
+            return ""
+        text = (titles[0].get("properties") or {}).get("text") or {}
+        literal = (text.get("expr") or {}).get("Literal") or {}
+        value = literal.get("Value")
+        return value.strip("'") if value else ""
+    except (KeyError, IndexError, TypeError, AttributeError):
         return ""
 
 
-def _prototype_to_dax(proto: dict, visual_type: str) -> str | None:
-    """Convert a prototypeQuery into a DAX string."""
-    from_clauses = proto.get("From", [])
-    select_clauses = proto.get("Select", [])
+def _source_ref(field: dict) -> str:
+    """Return the From alias a Column/Measure select field refers to."""
+    return field["Expression"]["SourceRef"]["Source"]
+
+
+def _build_dax_and_columns(
+    proto: dict, visual_type: str
+) -> tuple[str | None, list[dict]]:
+    """Convert a prototypeQuery into a DAX string and its output columns.
+
+    One pass over ``Select`` produces both, so visuals don't walk their
+    prototype query twice.  The DAX is None when no query can be built.
+    """
+    from_clauses = proto.get("From")
+    select_clauses = proto.get("Select")
     if not from_clauses or not select_clauses:
-        return None
+        return None, []
 
     # Build source alias map: alias -> entity name
     alias_map = {f["Name"]: f["Entity"] for f in from_clauses}
 
+    col_refs = []
+    measures = []  # pre-formatted '"name", expr' pairs
     columns = []
-    measures = []
 
     for sel in select_clauses:
-        if "Column" in sel:
-            source = sel["Column"]["Expression"]["SourceRef"]["Source"]
+        column = sel.get("Column")
+        if column is not None:
+            source = _source_ref(column)
             entity = alias_map.get(source, source)
-            prop = sel["Column"]["Property"]
-            columns.append(f"'{entity}'[{prop}]")
-        elif "Measure" in sel:
-            source = sel["Measure"]["Expression"]["SourceRef"]["Source"]
-            prop = sel["Measure"]["Property"]
-            measures.append((f'"{prop}"', f"[{prop}]"))
-        elif "Aggregation" in sel:
-            source = sel["Aggregation"]["Expression"]["Column"]["Expression"]["SourceRef"]["Source"]
+            prop = column["Property"]
+            col_refs.append(f"'{entity}'[{prop}]")
+            columns.append({"name": prop, "dataType": "String"})
+            continue
+        measure = sel.get("Measure")
+        if measure is not None:
+            prop = measure["Property"]
+            measures.append(f'"{prop}", [{prop}]')
+            columns.append({"name": prop, "dataType": "Double"})
+            continue
+        aggregation = sel.get("Aggregation")
+        if aggregation is not None:
+            agg_column = aggregation["Expression"]["Column"]
+            source = _source_ref(agg_column)
             entity = alias_map.get(source, source)
-            prop = sel["Aggregation"]["Expression"]["Column"]["Property"]
-            func_id = sel["Aggregation"].get("Function", 0)
-            agg_funcs = {0: "SUM", 1: "AVG", 2: "COUNT", 3: "MIN", 4: "MAX"}
-            agg = agg_funcs.get(func_id, "SUM")
-            measures.append((f'"{agg} of {prop}"', f"{agg}('{entity}'[{prop}])"))
+            prop = agg_column["Property"]
+            agg = _AGG_FUNCS.get(aggregation.get("Function", 0), "SUM")
+            measures.append(f'"{agg} of {prop}", {agg}(\'{entity}\'[{prop}])')
+            columns.append({"name": f"{agg} of {prop}", "dataType": "Double"})
+
+    measure_parts = ", ".join(measures)
 
     # Card visuals: just evaluate measures
-    if visual_type == "card" or (not columns and measures):
-        measure_parts = ", ".join(f"{name}, {expr}" for name, expr in measures)
-        return f"EVALUATE ROW({measure_parts})" if measure_parts else None
+    if visual_type == "card" or (not col_refs and measures):
+        dax = f"EVALUATE ROW({measure_parts})" if measure_parts else None
+        return dax, columns
 
-    col_refs = ", ".join(columns)
-    measure_parts = ", ".join(f"{name}, {expr}" for name, expr in measures)
+    col_list = ", ".join(col_refs)
 
-    if col_refs and measure_parts:
-        return f"EVALUATE SUMMARIZECOLUMNS({col_refs}, {measure_parts})"
-    elif col_refs:
-        return f"EVALUATE DISTINCT({col_refs})"
-    return None
+    if col_list and measure_parts:
+        return f"EVALUATE SUMMARIZECOLUMNS({col_list}, {measure_parts})", columns
+    elif col_list:
+        return f"EVALUATE DISTINCT({col_list})", columns
+    return None, columns
 
 
-def _infer_columns_from_proto(proto: dict) -> list[dict]:
-    """Infer output column names and types from a prototype query."""
-    columns = []
-    alias_map = {f["Name"]: f["Entity"] for f in proto.get("From", [])}
+def _prototype_to_dax(proto: dict, visual_type: str) -> str | None:
+    """Convert a prototypeQuery into a DAX string."""
+    return _build_dax_and_columns(proto, visual_type)[0]
 
-    for sel in proto.get("Select", []):
-        if "Column" in sel:
-            prop = sel["Column"]["Property"]
-            columns.append({"name": prop, "dataType": "String"})
-        elif "Measure" in sel:
-            prop = sel["Measure"]["Property"]
-            columns.append({"name": prop, "dataType": "Double"})
-        elif "Aggregation" in sel:
-            prop = sel["Aggregation"]["Expression"]["Column"]["Property"]
-            func_id = sel["Aggregation"].get("Function", 0)
-            agg_funcs = {0: "SUM", 1: "AVG", 2: "COUNT", 3: "MIN", 4: "MAX"}
-            agg = agg_funcs.get(func_id, "SUM")
-            columns.append({"name": f"{agg} of {prop}", "dataType": "Double"})
 
-    return columns
+def _infer_columns_from_proto(proto: dict) -> list[dict]:
+    """Infer output column names and types from a prototype query."""
+    return _build_dax_and_columns(proto, "")[1]